@@ -47,16 +47,48 @@ class ComplexMapper(Mapper):
         __type__ = Complex
         foo = field.String()
         bar = field.String(extra_serialize_pipes={'output': [bar_pipe]})
-        sub = field.Nested(SubMapper)
-        subs = field.Collection(field.Nested(SubMapper))
+        sub = field.Nested(SubMapper, allow_create=True)
+        subs = field.Collection(field.Nested(SubMapper, allow_create=True))
 
 
-def serialize(data, many=False):
+class CompiledSubMapper(SubMapper):
+        __compile__ = True
+
+
+class CompiledComplexMapper(ComplexMapper):
+        __compile__ = True
+        sub = field.Nested(CompiledSubMapper, allow_create=True)
+        subs = field.Collection(field.Nested(CompiledSubMapper, allow_create=True))
+
+
+def serialize(data, many=False, compiled=False, batch=False):
+
+    mapper = CompiledComplexMapper if compiled else ComplexMapper
+
+    if many and batch:
+        return mapper.many().serialize_batch(data)
+    elif many:
+        return mapper.many().serialize(data)
+    else:
+        return mapper(obj=data).serialize()
+
+
+def marshal(data, many=False, compiled=False):
+
+    mapper = CompiledComplexMapper if compiled else ComplexMapper
 
     if many:
-        return ComplexMapper.many().serialize(data)
+        return mapper.many().marshal(data)
     else:
-        ComplexMapper(obj=data).serialize()
+        return mapper(data=data).marshal()
 
 
 test_object = ParentTestObject()
+
+test_data = {
+    'foo': 'bar',
+    'bar': '5',
+    'sub': {'w': '100', 'x': '20', 'y': 'hello', 'z': '10'},
+    'subs': [{'w': str(1000 * i), 'x': str(20 * i), 'y': 'hello' * i,
+              'z': str(10 * i)} for i in range(10)],
+}
@@ -0,0 +1,212 @@
+"""Measure the memory used to serialize and marshal the objects in
+benchmarks/data.py using tracemalloc.
+
+For each scenario the peak memory traced while it runs and the memory still
+allocated once it returns are reported per row.  The peak includes garbage
+freed during the run such as pipeline sessions, the retained memory is mostly
+the output dicts or marshaled objects.  The difference between the two is the
+garbage live at the peak.
+
+The source lines in Kim responsible for the most retained allocations are then
+listed.  tracemalloc can't attribute memory that has already been freed, so the
+garbage is attributed by mapping a single row with a snapshot taken at the
+deepest pipeline, where the sessions of every enclosing mapper and field are
+still live.  Fields inlined by compiled mappers don't run a pipeline.
+
+Usage::
+
+    $ python benchmarks/memory.py
+    $ python benchmarks/memory.py --rows 100 --top 20 --match marshal
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+from tabulate import tabulate
+
+import kim
+
+from kim import profiling
+from kim.exception import StopPipelineExecution
+
+from data import serialize, marshal, test_object, test_data
+
+
+KIM_DIR = os.path.dirname(kim.__file__)
+
+
+class DeepestSnapshot(object):
+    """Pipeline hook installed with :func:`kim.profiling.enable` taking a
+    tracemalloc snapshot each time pipelines are nested deeper than before.
+    """
+
+    def __init__(self):
+
+        self.depth = 0
+        self.max_depth = 0
+        self.snapshot = None
+
+    def run_pipeline(self, pipeline, session, field):
+
+        self.depth += 1
+        try:
+            if self.depth > self.max_depth:
+                self.max_depth = self.depth
+                self.snapshot = tracemalloc.take_snapshot()
+
+            for pipe_func in pipeline:
+                pipe_func(session)
+        except StopPipelineExecution:
+            pass
+        finally:
+            self.depth -= 1
+
+        return session.output
+
+
+def get_scenarios(rows):
+    """Return a list of ``(name, func)`` tuples each mapping ``rows`` objects."""
+
+    objs = [test_object] * rows
+    data = [test_data] * rows
+
+    def one_by_one(func, items, **kwargs):
+        return lambda: [func(item, **kwargs) for item in items]
+
+    return [
+        ('serialize one', one_by_one(serialize, objs)),
+        ('serialize many', lambda: serialize(objs, many=True)),
+        ('serialize many (batch)', lambda: serialize(objs, many=True, batch=True)),
+        ('serialize one (compiled)', one_by_one(serialize, objs, compiled=True)),
+        ('serialize many (compiled)',
+         lambda: serialize(objs, many=True, compiled=True)),
+        ('marshal one', one_by_one(marshal, data)),
+        ('marshal many', lambda: marshal(data, many=True)),
+        ('marshal many (compiled)',
+         lambda: marshal(data, many=True, compiled=True)),
+    ]
+
+
+def measure(func, nframes=1):
+    """Run ``func`` with tracemalloc tracing allocations.
+
+    :returns: tuple of the peak traced memory in bytes, the memory still
+        allocated after ``func`` returns and the snapshots taken before and
+        after ``func`` ran.
+    """
+
+    func()  # build mapper caches and compiled plans before measuring
+    gc.collect()
+
+    tracemalloc.start(nframes)
+    try:
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    del result
+    return peak - start, current - start, before, after
+
+
+def measure_garbage(func, nframes=1):
+    """Run ``func`` taking a snapshot at its deepest pipeline.
+
+    :returns: the snapshots taken before ``func`` ran and at the deepest
+        pipeline or None if ``func`` ran no pipelines.
+    """
+
+    func()
+    gc.collect()
+
+    hook = DeepestSnapshot()
+    tracemalloc.start(nframes)
+    profiling.enable(hook)
+    try:
+        before = tracemalloc.take_snapshot()
+        func()
+    finally:
+        profiling.disable()
+        tracemalloc.stop()
+
+    return before, hook.snapshot
+
+
+def kim_lines(before, after, limit):
+    """Return the lines in the Kim package with the most new allocations
+    between ``before`` and ``after``.
+    """
+
+    filters = [tracemalloc.Filter(True, os.path.join(KIM_DIR, '*'))]
+    stats = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), 'lineno')
+
+    lines = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        lines.append((os.path.relpath(frame.filename, os.path.dirname(KIM_DIR)),
+                      frame.lineno, stat.size_diff, stat.count_diff))
+    return lines
+
+
+def run(rows=1000, top=10, match=None):
+
+    table = []
+    attributions = []
+    single_rows = dict(get_scenarios(1))
+    for name, func in get_scenarios(rows):
+        if match and match not in name:
+            continue
+
+        peak, retained, before, after = measure(func)
+        table.append([name, rows, peak / 1024.0, peak / float(rows),
+                      retained / float(rows), peak - retained])
+
+        garbage_before, deepest = measure_garbage(single_rows[name])
+        attributions.append((
+            name, kim_lines(before, after, top),
+            kim_lines(garbage_before, deepest, top) if deepest else []))
+
+    print(tabulate(table, headers=['Scenario', 'Rows', 'Peak (KiB)',
+                                   'Peak / row (B)', 'Retained / row (B)',
+                                   'Garbage (B)'],
+                   floatfmt='.1f'))
+
+    for name, retained_lines, garbage_lines in attributions:
+        print('\n%s' % name)
+        table = [['%s:%s' % (filename, lineno), size / float(rows),
+                  count / float(rows)]
+                 for filename, lineno, size, count in retained_lines]
+        print(tabulate(table, headers=['Retained', 'Bytes / row',
+                                       'Blocks / row'], floatfmt='.1f'))
+
+        if garbage_lines:
+            print('')
+            table = [['%s:%s' % (filename, lineno), size, count]
+                     for filename, lineno, size, count in garbage_lines]
+            print(tabulate(table, headers=['Live at deepest pipeline', 'Bytes',
+                                           'Blocks']))
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='number of objects mapped by each scenario')
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of source lines listed per scenario')
+    parser.add_argument('--match', help='only run scenarios containing MATCH')
+    args = parser.parse_args(argv)
+
+    run(rows=args.rows, top=args.top, match=args.match)
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -16,14 +16,15 @@ class timer():
         self.elapsed = time.time() - self.start
 
 
-def test_many(limit=1000):
+def test_many(limit=1000, compiled=False, batch=False):
     for i in range(0, limit):
-        serialize([test_object, test_object], many=True)
+        serialize([test_object, test_object], many=True, compiled=compiled,
+                  batch=batch)
 
 
-def test_one(limit=1000):
+def test_one(limit=1000, compiled=False):
     for i in range(0, limit):
-        serialize(test_object)
+        serialize(test_object, compiled=compiled)
 
 
 def run():
@@ -37,6 +38,18 @@ def run():
         test_one()
         results.append(result)
 
+    with timer('many compiled') as result:
+        test_many(compiled=True)
+        results.append(result)
+
+    with timer('one compiled') as result:
+        test_one(compiled=True)
+        results.append(result)
+
+    with timer('many batch') as result:
+        test_many(batch=True)
+        results.append(result)
+
     return results
 
 
@@ -45,6 +58,9 @@ def report():
     1000 objects once using the many() API and also 1000 objects one at a time using
     serialize().
 
+    Both tests are then repeated using mappers defined with ``__compile__ = True``
+    and the many() test is repeated using ``serialize_batch()``.
+
     We run the test three times to produce the avg, min and max of each test.  The
     data and mapper for the test can be found in benchmarks/data.py and represent a
     fairly typical set of requirements from a mapper.
@@ -68,11 +84,14 @@ def report():
     results2 = run()
     results3 = run()
 
-    many_results = [results1[0].elapsed, results2[0].elapsed, results3[0].elapsed]
-    one_results = [results1[1].elapsed, results2[1].elapsed, results3[1].elapsed]
+    def get_results(index):
+
+        return [results1[index].elapsed, results2[index].elapsed,
+                results3[index].elapsed]
 
-    many_avg = (many_results[0] + many_results[1] + many_results[2]) / 3
-    one_avg = (one_results[0] + one_results[1] + one_results[2]) / 3
+    def find_avg(results):
+
+        return sum(results) / len(results)
 
     def find_min(results):
 
@@ -96,14 +115,13 @@ def report():
 
         return max_result
 
-    many_min = find_min(many_results)
-    one_min = find_min(one_results)
-    many_max = find_max(many_results)
-    one_max = find_max(one_results)
-
     table = []
-    table.append(['Serialize Many', many_avg, many_min, many_max])
-    table.append(['Serialize One', one_avg, one_min, one_max])
+    names = ['Serialize Many', 'Serialize One',
+             'Serialize Many (compiled)', 'Serialize One (compiled)',
+             'Serialize Many (batch)']
+    for index, name in enumerate(names):
+        results = get_results(index)
+        table.append([name, find_avg(results), find_min(results), find_max(results)])
 
     print(tabulate(table, headers=['Test', 'Avg', 'Min', 'Max']))
 
@@ -1,4 +1,7 @@
 import cProfile
+import sys
+
+from kim import profiling
 
 from data import serialize, test_object
 
@@ -34,6 +37,25 @@ def run():
     test_one()
 
 
+def run_pipes(limit=1000):
+    """Report the time spent in each pipe rather than profiling the whole
+    program.
+
+    Usage::
+
+        $ python benchmarks/prof.py pipes
+    """
+
+    with profiling.PipeProfiler() as profiler:
+        for i in range(0, limit):
+            serialize([test_object, test_object], many=True)
+
+    print(profiler.report(limit=20))
+
+
 if __name__ == '__main__':
 
-    run()
+    if sys.argv[1:] == ['pipes']:
+        run_pipes()
+    else:
+        run()
@@ -0,0 +1,504 @@
+"""Benchmark suite timing a matrix of marshal, validate and serialize scenarios.
+
+Every scenario is run once for each row count and the timings are written as
+JSON so they can be stored as a baseline and compared against later runs.
+
+Usage::
+
+    $ python benchmarks/suite.py --output baseline.json
+    $ python benchmarks/suite.py --baseline baseline.json --threshold 0.1
+
+The second command exits with status 1 when the median time of any scenario is
+more than 10% slower than in the baseline.
+"""
+
+import argparse
+import datetime
+import decimal
+import json
+import platform
+import sys
+
+from timeit import default_timer
+
+from tabulate import tabulate
+
+import kim
+from kim import Mapper, PolymorphicMapper, field, whitelist, blacklist
+from kim.exception import MappingInvalid
+
+
+DEFAULT_ROWS = (1, 100, 1000)
+
+
+class Obj(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+# Every built-in field type with the value serialized and the value marshaled.
+FIELD_TYPES = {
+    'string': (field.String, 'hello', 'hello'),
+    'integer': (field.Integer, 10, 10),
+    'float': (field.Float, 1.5, 1.5),
+    'decimal': (field.Decimal, decimal.Decimal('1.5'), '1.5'),
+    'boolean': (field.Boolean, True, True),
+    'datetime': (field.DateTime, datetime.datetime(2016, 1, 1, 12, 30),
+                 '2016-01-01T12:30:00'),
+    'date': (field.Date, datetime.date(2016, 1, 1), '2016-01-01'),
+    'static': (lambda: field.Static('static'), None, None),
+    'collection': (lambda: field.Collection(field.Integer()), [1, 2, 3],
+                   [1, 2, 3]),
+}
+
+
+def field_type_mapper(type_name):
+    """Return a mapper with ten fields of ``type_name``."""
+
+    field_cls = FIELD_TYPES[type_name][0]
+    attrs = dict(('f%s' % i, field_cls()) for i in range(10))
+    attrs['__type__'] = Obj
+    return type('%sMapper' % type_name.title(), (Mapper,), attrs)
+
+
+FIELD_TYPE_MAPPERS = dict((name, field_type_mapper(name)) for name in FIELD_TYPES)
+
+
+class ItemMapper(Mapper):
+
+    __type__ = Obj
+
+    id = field.Integer(required=True)
+    name = field.String(required=True)
+    price = field.Float()
+    active = field.Boolean()
+
+
+class UserMapper(Mapper):
+
+    __type__ = Obj
+
+    id = field.Integer(required=True)
+    name = field.String(required=True)
+    email = field.String()
+    password = field.String()
+    created_at = field.DateTime(read_only=True)
+    score = field.Integer()
+    bio = field.String()
+    tags = field.Collection(field.String())
+
+    __roles__ = {
+        'public': whitelist('id', 'name', 'created_at'),
+        'private': blacklist('password'),
+    }
+
+
+class OrderMapper(Mapper):
+
+    __type__ = Obj
+
+    id = field.Integer(required=True)
+    user = field.Nested(UserMapper, allow_create=True, allow_updates=True)
+    items = field.Collection(field.Nested(ItemMapper, allow_create=True))
+
+
+class NodeMapper(Mapper):
+
+    __type__ = Obj
+
+    id = field.Integer()
+    name = field.String()
+    child = field.Nested('NodeMapper', allow_create=True, required=False)
+
+
+class ActivityMapper(PolymorphicMapper):
+
+    __type__ = Obj
+
+    id = field.Integer()
+    name = field.String()
+    object_type = field.String(choices=['event', 'task'])
+
+    __mapper_args__ = {
+        'polymorphic_on': object_type,
+    }
+
+
+class TaskMapper(ActivityMapper):
+
+    __type__ = Obj
+
+    is_complete = field.Boolean()
+
+    __mapper_args__ = {
+        'polymorphic_name': 'task',
+    }
+
+
+class EventMapper(ActivityMapper):
+
+    __type__ = Obj
+
+    location = field.String()
+
+    __mapper_args__ = {
+        'polymorphic_name': 'event',
+    }
+
+
+def make_user(i):
+
+    return Obj(id=i, name='user %s' % i, email='user%s@example.com' % i,
+               password='secret', created_at=datetime.datetime(2016, 1, 1),
+               score=i * 10, bio='bio ' * 10, tags=['a', 'b', 'c'])
+
+
+def user_data(i):
+
+    return {'id': i, 'name': 'user %s' % i, 'email': 'user%s@example.com' % i,
+            'password': 'secret', 'score': i * 10, 'bio': 'bio ' * 10,
+            'tags': ['a', 'b', 'c']}
+
+
+def make_node(i, depth):
+
+    node = None
+    for level in range(depth):
+        node = Obj(id=i, name='node %s' % level, child=node)
+    return node
+
+
+def node_data(i, depth):
+
+    data = {'id': i, 'name': 'node 0'}
+    for level in range(1, depth):
+        data = {'id': i, 'name': 'node %s' % level, 'child': data}
+    return data
+
+
+def make_activity(i):
+
+    if i % 2:
+        return Obj(id=i, name='task', object_type='task', is_complete=True)
+    return Obj(id=i, name='event', object_type='event', location='home')
+
+
+def field_type_scenario(operation, type_name):
+    """Build the setup function of a scenario mapping ``rows`` objects with ten
+    fields of ``type_name``.
+    """
+
+    mapper = FIELD_TYPE_MAPPERS[type_name]
+    obj_value, data_value = FIELD_TYPES[type_name][1:]
+
+    def setup(rows):
+
+        if operation == 'serialize':
+            objs = [Obj(**dict(('f%s' % n, obj_value) for n in range(10)))
+                    for i in range(rows)]
+            return lambda: mapper.many().serialize(objs)
+
+        data = [dict(('f%s' % n, data_value) for n in range(10))
+                for i in range(rows)]
+        return lambda: mapper.many().marshal(data)
+
+    return setup
+
+
+def serialize_users(role='__default__'):
+
+    def setup(rows):
+        objs = [make_user(i) for i in range(rows)]
+        return lambda: UserMapper.many().serialize(objs, role=role)
+
+    return setup
+
+
+def marshal_users(role='__default__'):
+
+    def setup(rows):
+        data = [user_data(i) for i in range(rows)]
+        return lambda: UserMapper.many().marshal(data, role=role)
+
+    return setup
+
+
+def marshal_users_partial(rows):
+
+    objs = [make_user(i) for i in range(rows)]
+    data = [{'name': 'new name'} for i in range(rows)]
+
+    def run():
+        for obj, datum in zip(objs, data):
+            UserMapper(obj=obj, data=datum, partial=True).marshal()
+
+    return run
+
+
+def marshal_users_invalid(fail_fast=False):
+
+    def setup(rows):
+        data = [{'id': 'abc', 'name': None, 'email': 1, 'score': 'x', 'tags': 1}
+                for i in range(rows)]
+
+        def run():
+            for datum in data:
+                try:
+                    UserMapper(data=datum).marshal(fail_fast=fail_fast)
+                except MappingInvalid:
+                    pass
+
+        return run
+
+    return setup
+
+
+def validate_orders(items):
+
+    def setup(rows):
+        data = [{'id': i, 'user': user_data(i),
+                 'items': [{'id': n, 'name': 'item', 'price': 1.5,
+                            'active': True} for n in range(items)]}
+                for i in range(rows)]
+
+        def run():
+            for datum in data:
+                OrderMapper(data=datum).validate_data()
+
+        return run
+
+    return setup
+
+
+def serialize_orders(items):
+
+    def setup(rows):
+        orders = [Obj(id=i, user=make_user(i),
+                      items=[Obj(id=n, name='item', price=1.5, active=True)
+                             for n in range(items)])
+                  for i in range(rows)]
+        return lambda: OrderMapper.many().serialize(orders)
+
+    return setup
+
+
+def marshal_orders(items):
+
+    def setup(rows):
+        data = [{'id': i, 'user': user_data(i),
+                 'items': [{'id': n, 'name': 'item', 'price': 1.5,
+                            'active': True} for n in range(items)]}
+                for i in range(rows)]
+        return lambda: OrderMapper.many().marshal(data)
+
+    return setup
+
+
+def serialize_nodes(depth):
+
+    def setup(rows):
+        nodes = [make_node(i, depth) for i in range(rows)]
+        return lambda: NodeMapper.many().serialize(nodes)
+
+    return setup
+
+
+def marshal_nodes(depth):
+
+    def setup(rows):
+        data = [node_data(i, depth) for i in range(rows)]
+        return lambda: NodeMapper.many().marshal(data)
+
+    return setup
+
+
+def serialize_activities(rows):
+
+    objs = [make_activity(i) for i in range(rows)]
+    return lambda: ActivityMapper.many().serialize(objs)
+
+
+def get_scenarios():
+    """Return a list of ``(name, setup)`` tuples.  ``setup`` is called with the
+    number of rows and returns the function to time.
+    """
+
+    scenarios = []
+    for type_name in sorted(FIELD_TYPES):
+        scenarios.append(('serialize.field.%s' % type_name,
+                          field_type_scenario('serialize', type_name)))
+        if type_name != 'static':
+            scenarios.append(('marshal.field.%s' % type_name,
+                              field_type_scenario('marshal', type_name)))
+
+    scenarios.extend([
+        ('serialize.role.default', serialize_users()),
+        ('serialize.role.whitelist', serialize_users('public')),
+        ('serialize.role.blacklist', serialize_users('private')),
+        ('marshal.role.default', marshal_users()),
+        ('marshal.role.whitelist', marshal_users('public')),
+        ('marshal.partial', marshal_users_partial),
+        ('marshal.invalid', marshal_users_invalid()),
+        ('marshal.invalid.fail_fast', marshal_users_invalid(fail_fast=True)),
+        ('serialize.polymorphic', serialize_activities),
+        ('serialize.nested.depth_1', serialize_nodes(1)),
+        ('serialize.nested.depth_10', serialize_nodes(10)),
+        ('marshal.nested.depth_1', marshal_nodes(1)),
+        ('marshal.nested.depth_10', marshal_nodes(10)),
+        ('serialize.collection.items_10', serialize_orders(10)),
+        ('serialize.collection.items_1000', serialize_orders(1000)),
+        ('marshal.collection.items_10', marshal_orders(10)),
+        ('marshal.collection.items_1000', marshal_orders(1000)),
+        ('validate.collection.items_10', validate_orders(10)),
+        ('validate.collection.items_1000', validate_orders(1000)),
+    ])
+
+    return scenarios
+
+
+def median(values):
+
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def time_scenario(func, repeat):
+    """Call ``func`` ``repeat`` times returning the time taken by each call."""
+
+    func()  # warm up caches before timing
+
+    timings = []
+    for i in range(repeat):
+        start = default_timer()
+        func()
+        timings.append(default_timer() - start)
+
+    return timings
+
+
+def run(rows=DEFAULT_ROWS, repeat=5, match=None):
+    """Run every scenario matching ``match`` once for each row count.
+
+    :returns: dict of metadata and a list of results
+    """
+
+    results = []
+    for name, setup in get_scenarios():
+        if match and match not in name:
+            continue
+
+        for row_count in rows:
+            # Collections of 1000 items are already large, keep these runs short.
+            if 'items_1000' in name and row_count > 100:
+                continue
+
+            timings = time_scenario(setup(row_count), repeat)
+            results.append({
+                'name': name,
+                'rows': row_count,
+                'min': min(timings),
+                'median': median(timings),
+                'mean': sum(timings) / len(timings),
+                'max': max(timings),
+            })
+
+    return {
+        'meta': {
+            'kim': kim.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Compare the median times of ``report`` against ``baseline``.
+
+    :returns: list of ``(name, rows, baseline, median, change)`` tuples for
+        the results slower than ``baseline`` by more than ``threshold``.
+    """
+
+    baseline_results = dict(((r['name'], r['rows']), r['median'])
+                            for r in baseline['results'])
+
+    regressions = []
+    for result in report['results']:
+        previous = baseline_results.get((result['name'], result['rows']))
+        if not previous:
+            continue
+
+        change = (result['median'] - previous) / previous
+        result['baseline'] = previous
+        result['change'] = change
+        if change > threshold:
+            regressions.append((result['name'], result['rows'], previous,
+                                result['median'], change))
+
+    return regressions
+
+
+def print_report(report):
+
+    table = []
+    for r in report['results']:
+        row = [r['name'], r['rows'], r['median'] * 1000, r['min'] * 1000,
+               r['max'] * 1000]
+        if 'change' in r:
+            row.append('%+.1f%%' % (r['change'] * 100))
+        table.append(row)
+
+    headers = ['Scenario', 'Rows', 'Median (ms)', 'Min (ms)', 'Max (ms)',
+               'Change']
+    print(tabulate(table, headers=headers, floatfmt='.3f'))
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='row counts each scenario is run with')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timed runs of each scenario')
+    parser.add_argument('--match', help='only run scenarios containing MATCH')
+    parser.add_argument('--output', help='write the results as JSON to OUTPUT')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='fraction slower than the baseline counted as a '
+                             'regression, defaults to 0.1')
+    args = parser.parse_args(argv)
+
+    report = run(rows=args.rows, repeat=args.repeat, match=args.match)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    print_report(report)
+
+    if regressions:
+        print('\n%s regression(s) over %.0f%%:' % (
+            len(regressions), args.threshold * 100))
+        for name, rows, previous, current, change in regressions:
+            print('  %s (%s rows): %.3fms -> %.3fms (%+.1f%%)' % (
+                name, rows, previous * 1000, current * 1000, change * 100))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,351 @@
+# kim/aio.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""asyncio support for marshaling and serializing.  Requires Python 3.5+.
+
+Fields are run through the same pipelines as :meth:`kim.mapper.Mapper.marshal`
+and :meth:`kim.mapper.Mapper.serialize`, awaiting any pipe or getter that
+returns an awaitable.  The pipes mapping Nested fields and Collections are
+replaced by the coroutines in :data:`ASYNC_PIPES`.
+"""
+
+import asyncio
+import inspect
+import sys
+
+from .exception import FieldInvalid, MappingInvalid, MapperError, \
+    StopPipelineExecution
+from .pipelines.base import pipe, Session
+from .pipelines.collection import (
+    marshall_collection, serialize_collection, get_collection_items,
+    get_getter_sessions, match_getter_results)
+from .pipelines.nested import (
+    marshal_nested, serialize_nested, get_nested_mapper,
+    _call_getter as _call_resolved_getter)
+
+
+async def _resolve(value):
+
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _call_getter(getter, session):
+    """Call a Nested getter catching any exception so it can be raised when the
+    item is marshaled.
+    """
+
+    try:
+        return await _resolve(getter(session)), None
+    except Exception:
+        return None, sys.exc_info()
+
+
+async def call_getter(session):
+    """Return the object resolved by the getter or batch_getter of a Nested
+    field, awaiting the result if it's awaitable.
+
+    :param session: Kim pipeline session instance
+    :returns: the resolved object or None
+    """
+
+    opts = session.field.opts
+    if (session.parent is not None and session.parent.resolved is not None) or \
+            not (opts.getter or opts.batch_getter):
+        return _call_resolved_getter(session)
+
+    if opts.getter:
+        return await _resolve(opts.getter(session))
+
+    resolved = await _resolve(opts.batch_getter([session]))
+    return resolved.get(0)
+
+
+async def resolve_getters(session, items):
+    """Resolve the objects of the Nested field wrapped by a collection for every
+    item up front.  A ``batch_getter`` is awaited once for all of the items,
+    otherwise the ``getter`` of each item is gathered concurrently.
+
+    :param session: Kim pipeline session instance
+    :param items: list of the output and mapper session of each item
+    :returns: list of (result, exc_info) tuples in the order of ``items`` or
+        None if the wrapped field has no getter.
+    """
+
+    opts = session.field.opts.field.opts
+    getter = getattr(opts, 'getter', None)
+    batch_getter = getattr(opts, 'batch_getter', None)
+
+    if getter is None and batch_getter is None:
+        return None
+
+    sessions = get_getter_sessions(session, items)
+
+    if batch_getter is not None:
+        resolved = await _resolve(batch_getter(sessions)) if sessions else {}
+        results = [(resolved.get(i), None) for i in range(len(sessions))]
+    else:
+        results = await asyncio.gather(
+            *[_call_getter(getter, s) for s in sessions])
+
+    return match_getter_results(items, results)
+
+
+@pipe()
+async def marshal_nested_async(session):
+    """Async version of :func:`kim.pipelines.nested.marshal_nested`.
+
+    :param session: Kim pipeline session instance
+    """
+
+    resolved = await call_getter(session)
+    nested_mapper = get_nested_mapper(session, resolved)
+
+    if nested_mapper is None:
+        session.data = resolved
+    else:
+        session.data = await marshal_async(
+            nested_mapper, role=session.field.opts.role)
+
+    return session.data
+
+
+@pipe(run_if_none=True)
+async def serialize_nested_async(session):
+    """Async version of :func:`kim.pipelines.nested.serialize_nested`.
+
+    :param session: Kim pipeline session instance
+    """
+
+    if session.data is None:
+        session.data = session.field.opts.null_default
+        return session.data
+
+    if session.parent and session.parent.nested_mapper:
+        nested_mapper = session.parent.nested_mapper(obj=session.data)
+    else:
+        nested_mapper = session.field.get_mapper(obj=session.data)
+
+    session.data = await serialize_async(
+        nested_mapper, role=session.field.opts.role)
+
+    return session.data
+
+
+@pipe(run_if_none=True)
+async def marshal_collection_async(session):
+    """Async version of :func:`kim.pipelines.collection.marshall_collection`.
+    The getters of a wrapped Nested field are gathered for every item before
+    the items are marshaled.
+
+    :param session: Kim pipeline session instance
+    """
+
+    wrapped_field = session.field.opts.field
+
+    output = []
+
+    if session.data is not None:
+        items = get_collection_items(session)
+        resolved = await resolve_getters(session, items)
+
+        for i, (_output, mapper_session) in enumerate(items):
+            if resolved is not None:
+                session.resolved = resolved[i]
+            await marshal_field(wrapped_field, mapper_session,
+                                parent_session=session)
+
+            output.append(_output[wrapped_field.opts.source])
+
+        session.resolved = None
+
+    session.data = output
+    return session.data
+
+
+@pipe()
+async def serialize_collection_async(session):
+    """Async version of :func:`kim.pipelines.collection.serialize_collection`.
+
+    :param session: Kim pipeline session instance
+    """
+
+    wrapped_field = session.field.opts.field
+    field_name = wrapped_field.name
+    output = []
+
+    mapper_session = session.mapper.get_mapper_session(None, {})
+
+    session.nested_mapper = getattr(
+        wrapped_field,
+        'get_mapper',
+        lambda **kwargs: None)(as_class=True)
+
+    for datum in session.data:
+        mapper_session.data = datum
+        mapper_session.output = {}
+        await serialize_field(wrapped_field, mapper_session,
+                              parent_session=session)
+        output.append(mapper_session.output[field_name])
+
+    session.data = output
+    return session.data
+
+
+#: Pipes replaced by a coroutine when run by :func:`run_pipeline_async`.
+ASYNC_PIPES = {
+    marshal_nested: marshal_nested_async,
+    serialize_nested: serialize_nested_async,
+    marshall_collection: marshal_collection_async,
+    serialize_collection: serialize_collection_async,
+}
+
+
+async def run_pipeline_async(pipeline, session):
+    """Async version of :func:`kim.pipelines.base.run_pipeline`, awaiting pipes
+    returning an awaitable.
+
+    :param pipeline: list of pipe functions
+    :param session: Kim pipeline session instance
+    :returns: Returns the output of the pipelines session.
+    """
+
+    try:
+        for pipe_func in pipeline:
+            result = ASYNC_PIPES.get(pipe_func, pipe_func)(session)
+            if inspect.isawaitable(result):
+                await result
+
+        return session.output
+
+    except StopPipelineExecution:
+        return session.output
+
+
+def _overrides(field, method):
+
+    from .field import Field
+
+    return getattr(type(field), method) is not getattr(Field, method)
+
+
+async def marshal_field(field, mapper_session, parent_session=None):
+    """Async version of :meth:`kim.field.Field.marshal`.  Fields overriding
+    ``marshal`` are marshaled synchronously.
+
+    :param field: :class:`kim.field.Field` instance
+    :param mapper_session: The Mappers marshaling session this field is being
+        run inside of.
+    :param parent_session: the session of the field wrapping ``field``
+    :returns: None
+    """
+
+    if _overrides(field, 'marshal'):
+        field.marshal(mapper_session, parent_session=parent_session)
+        return
+
+    session = Session(field, mapper_session.data, mapper_session.output,
+                      mapper_session=mapper_session, parent=parent_session)
+    await run_pipeline_async(field.marshal_pipes, session)
+
+
+async def serialize_field(field, mapper_session, parent_session=None):
+    """Async version of :meth:`kim.field.Field.serialize`.  Fields overriding
+    ``serialize`` are serialized synchronously.
+
+    :param field: :class:`kim.field.Field` instance
+    :param mapper_session: The Mappers serialization session this field is
+        being run inside of.
+    :param parent_session: the session of the field wrapping ``field``
+    :returns: None
+    """
+
+    if _overrides(field, 'serialize'):
+        field.serialize(mapper_session, parent_session=parent_session)
+        return
+
+    session = Session(field, mapper_session.data, mapper_session.output,
+                      mapper_session=mapper_session, parent=parent_session)
+    await run_pipeline_async(field.serialize_pipes, session)
+
+
+async def _marshal_field_errors(mapper, field, data, output):
+
+    try:
+        await marshal_field(field, mapper.get_mapper_session(data, output))
+    except FieldInvalid as e:
+        return e.message
+    except MappingInvalid as e:
+        # handle errors from nested mappers.
+        return e.pending_errors
+
+
+async def marshal_async(mapper, role='__default__'):
+    """Marshal ``mapper.data`` into ``mapper.obj``.  Fields are marshaled
+    concurrently so the getters of independent Nested fields are awaited at
+    the same time.
+
+    :param mapper: :class:`kim.mapper.Mapper` instance
+    :param role: the name of a role as a string or a :class:`Role` instance.
+    :raises: :class:`kim.exception.MappingInvalid`
+    :returns: Object of ``__type__`` populated with data
+
+    .. seealso::
+        :meth:`kim.mapper.Mapper.marshal`
+    """
+
+    if mapper.initial_errors is not None:
+        raise MappingInvalid(mapper.initial_errors)
+
+    output = mapper._get_obj()
+    data = mapper.data
+
+    fields = mapper._get_fields(role, for_marshal=True)
+    errors = await asyncio.gather(
+        *[_marshal_field_errors(mapper, f, data, output) for f in fields])
+
+    for field, error in zip(fields, errors):
+        if error is not None:
+            mapper._errors[field.opts.output_name] = error
+
+    return mapper._validate_output(output)
+
+
+async def serialize_async(mapper, role='__default__', raw=False,
+                          deferred_role=None):
+    """Serialize ``mapper.obj`` into a dict.  Fields are serialized in order so
+    the output matches :meth:`kim.mapper.Mapper.serialize`.
+
+    :param mapper: :class:`kim.mapper.Mapper` instance
+    :param role: specify the role to use when serializing this mapper
+    :param raw: instruct the mapper to transform the data before serializing.
+    :param deferred_role: an instance of role used to dynamically a new role.
+    :raises: :class:`MapperError`
+    :returns: dict containing serialized object
+
+    .. seealso::
+        :meth:`kim.mapper.Mapper.serialize`
+    """
+
+    output = {}
+
+    if mapper.obj is None:
+        raise MapperError(
+            'Attmpted to serialize None, have you passed a valid obj param to %s()?'
+            % mapper.__class__.__name__)
+
+    data = mapper.obj
+    if raw or mapper.raw:
+        data = mapper.transform_data(data)
+
+    fields = mapper._get_role_fields(role, deferred_role=deferred_role)[1]
+    mapper_session = mapper.get_mapper_session(data, output)
+    for field in fields:
+        await serialize_field(field, mapper_session)
+
+    return output
@@ -0,0 +1,505 @@
+# kim/compiler.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+from decimal import Decimal
+
+import six
+
+from .exception import FieldInvalid, MappingInvalid, StopPipelineExecution, \
+    PendingError
+from .utils import _attr_or_key
+from .pipelines.base import (
+    Session, get_data_from_source, set_default, update_output_to_name,
+    read_only, get_data_from_name, update_output_to_source, is_valid_choice,
+    get_pipe_steps, INVALID)
+from .pipelines.collection import serialize_collection, check_duplicates
+from .pipelines.datetime import format_datetime
+from .pipelines.nested import serialize_nested
+from .pipelines.numeric import coerce_to_decimal, coerce_to_float, to_string
+from .pipelines.numeric import bounds_check as numeric_bounds_check
+from .pipelines.static import get_static_value
+from .pipelines.string import blank_check
+from .pipelines.string import bounds_check as string_bounds_check
+
+
+#: Maps the process pipes of the built-in serialize pipelines to the name of
+#: the emitter used to inline them.  Any other combination of pipes (ie. a
+#: field using ``extra_serialize_pipes`` or a custom Pipeline) is not inlined.
+SERIALIZE_KINDS = {
+    (): 'plain',
+    (format_datetime, ): 'datetime',
+    (coerce_to_decimal, to_string): 'decimal',
+    (coerce_to_float, to_string): 'float',
+    (get_static_value, ): 'static',
+    (serialize_nested, ): 'nested',
+    (serialize_collection, ): 'collection',
+}
+
+
+def _has_bounds(opts):
+
+    return opts.max is not None or opts.min is not None
+
+
+#: Validation pipes that only have an effect when a field option is set.  The
+#: marshal plan for a field skips them when the predicate returns False.
+PRUNABLE_PIPES = {
+    is_valid_choice: lambda opts: opts.choices is not None,
+    string_bounds_check: _has_bounds,
+    numeric_bounds_check: _has_bounds,
+    blank_check: lambda opts: opts.blank is False,
+    check_duplicates: lambda opts: bool(opts.unique_on),
+}
+
+
+def _unbound(method):
+
+    return six.get_unbound_function(method)
+
+
+def get_serialize_kind(field):
+    """Return the name of the emitter used to inline ``field`` when serializing or
+    None if the field must be run through its serialize pipeline.
+
+    Fields are only inlined when they use one of the built-in serialize
+    pipelines unchanged.
+
+    :param field: :class:`kim.field.Field` instance
+    :rtype: str or None
+    :returns: the kind of the field
+    """
+
+    from .field import Field
+
+    if _unbound(type(field).serialize) is not _unbound(Field.serialize):
+        return None
+
+    pipes = field.serialize_pipes
+    if len(pipes) < 3 or pipes[0] is not get_data_from_source or \
+            pipes[-2] is not set_default or pipes[-1] is not update_output_to_name:
+        return None
+
+    kind = SERIALIZE_KINDS.get(tuple(pipes[1:-2]))
+    if kind == 'collection' and get_serialize_kind(field.opts.field) is None:
+        return None
+
+    return kind
+
+
+class SerializerBuilder(object):
+    """Generates the source of a flat serialize function for a list of fields.
+
+    Each field is either inlined as a handful of statements reading the value
+    from ``obj``, converting it and writing it to ``output`` or, if the field
+    can't be inlined, delegated to :meth:`kim.field.Field.serialize`.
+    """
+
+    def __init__(self, name, accessor='auto'):
+
+        self.name = name
+        self.accessor = accessor
+        self.lines = []
+        self.namespace = {
+            '_isinstance': isinstance,
+            '_dict': dict,
+            '_getattr': getattr,
+            '_attr_or_key': _attr_or_key,
+            '_str': str,
+            '_float': float,
+            '_round': round,
+            '_Decimal': Decimal,
+        }
+        self._counter = 0
+
+    def ref(self, value):
+        """Store ``value`` in the namespace of the generated function and return
+        the name used to reference it.
+        """
+
+        self._counter += 1
+        name = '_ref%d' % self._counter
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent, line):
+
+        self.lines.append('    ' * indent + line)
+
+    def emit_read(self, indent, field):
+
+        if field.opts.source == '__self__':
+            self.emit(indent, 'value = obj')
+            return
+
+        components = field.opts.source_path
+        if self.accessor == 'attr':
+            self.emit(indent, 'value = _getattr(obj, %r, None)' % components[0])
+        elif self.accessor == 'dict':
+            self.emit(indent, 'value = obj.get(%r)' % components[0])
+        else:
+            self.emit(indent, 'value = obj.get(%r) if _is_dict else '
+                      '_getattr(obj, %r, None)' % (components[0], components[0]))
+
+        for component in components[1:]:
+            if self.accessor == 'attr':
+                self.emit(indent, 'value = _getattr(value, %r, None)' % component)
+            elif self.accessor == 'dict':
+                self.emit(indent, 'value = value.get(%r) if value is not None '
+                          'else None' % component)
+            else:
+                self.emit(indent, 'value = _attr_or_key(value, %r)' % component)
+
+    def emit_convert(self, indent, var, field, depth=0):
+        """Emit the statements converting ``var`` for the process pipes of ``field``
+        followed by the default handling of ``set_default``.
+        """
+
+        kind = get_serialize_kind(field)
+        opts = field.opts
+
+        if kind == 'datetime':
+            self.emit(indent, 'if %s is not None:' % var)
+            if opts.date_format == 'iso8601':
+                self.emit(indent + 1, '%s = %s.isoformat()' % (var, var))
+            else:
+                self.emit(indent + 1, '%s = %s.strftime(%r)'
+                          % (var, var, opts.date_format))
+        elif kind == 'decimal':
+            decimals = opts.precision
+            precision = self.ref(Decimal('0.' + '0' * (decimals - 1) + '1'))
+            self.emit(indent, 'if %s is not None:' % var)
+            self.emit(indent + 1, '%s = _str(_Decimal(%s).quantize(%s))'
+                      % (var, var, precision))
+        elif kind == 'float':
+            self.emit(indent, 'if %s is not None:' % var)
+            self.emit(indent + 1, '%s = _str(_round(_float(%s), %r))'
+                      % (var, var, opts.precision))
+        elif kind == 'static':
+            self.emit(indent, '%s = %s' % (var, self.ref(opts.value)))
+        elif kind == 'nested':
+            self.emit(indent, 'if %s is None:' % var)
+            self.emit(indent + 1, '%s = %s' % (var, self.ref(opts.null_default)))
+            self.emit(indent, 'else:')
+            self.emit(indent + 1, '%s = %s(obj=%s).serialize(role=%s)'
+                      % (var, self.ref(field.get_mapper), var, self.ref(opts.role)))
+        elif kind == 'collection':
+            items, item = '_items%d' % depth, '_item%d' % depth
+            self.emit(indent, 'if %s is not None:' % var)
+            self.emit(indent + 1, '%s = []' % items)
+            self.emit(indent + 1, 'for %s in %s:' % (item, var))
+            self.emit_convert(indent + 2, item, opts.field, depth=depth + 1)
+            self.emit(indent + 2, '%s.append(%s)' % (items, item))
+            self.emit(indent + 1, '%s = %s' % (var, items))
+
+        if opts.default is not None:
+            self.emit(indent, 'if %s is None:' % var)
+            self.emit(indent + 1, '%s = %s' % (var, self.ref(opts.default)))
+
+    def build(self, fields):
+        """Generate and compile the serialize function for ``fields``.
+
+        :param fields: iterable of :class:`kim.field.Field` instances
+        :returns: function accepting a mapper instance and the obj being
+            serialized and returning the serialized output.
+        """
+
+        fields = list(fields)
+        kinds = [get_serialize_kind(f) for f in fields]
+
+        self.emit(0, 'def %s(mapper, obj):' % self.name)
+        self.emit(1, 'output = {}')
+        if self.accessor == 'auto':
+            self.emit(1, '_is_dict = _isinstance(obj, _dict)')
+        if None in kinds:
+            self.emit(1, 'mapper_session = mapper.get_mapper_session(obj, output)')
+            self.emit(1, 'session = %s()' % self.ref(Session))
+
+        for field, kind in zip(fields, kinds):
+            if kind is None:
+                self.emit(1, '%s(mapper_session, session=session)'
+                          % self.ref(field.serialize))
+                continue
+
+            self.emit_read(1, field)
+            self.emit_convert(1, 'value', field)
+            self.emit(1, 'output[%r] = value' % field.opts.output_name)
+
+        self.emit(1, 'return output')
+
+        source = '\n'.join(self.lines)
+        code = compile(source, '<kim serializer %s>' % self.name, 'exec')
+        six.exec_(code, self.namespace)
+
+        func = self.namespace[self.name]
+        func.source = source
+        return func
+
+
+def compile_serializer(mapper_cls, role_name, fields):
+    """Compile a function that serializes an object using ``fields``.
+
+    :param mapper_cls: the :class:`kim.mapper.Mapper` the function is built for
+    :param role_name: name of the role ``fields`` were resolved from
+    :param fields: iterable of :class:`kim.field.Field` instances
+    :returns: function accepting a mapper instance and the obj being
+        serialized and returning the serialized output.
+
+    .. seealso::
+        :class:`SerializerBuilder`
+    """
+
+    name = 'serialize_%s_%s' % (
+        mapper_cls.__name__, ''.join(c if c.isalnum() else '_' for c in role_name))
+    return SerializerBuilder(name, mapper_cls.__accessor__).build(fields)
+
+
+def serialize_column(field, values):
+    """Convert a column of ``values`` read for ``field`` from many objects,
+    applying the process pipes of the field followed by its default.
+
+    :param field: :class:`kim.field.Field` instance with a serialize kind
+    :param values: list of values read from the source of ``field``
+    :returns: list of serialized values
+
+    .. seealso::
+        :func:`get_serialize_kind`
+    """
+
+    kind = get_serialize_kind(field)
+    opts = field.opts
+
+    if kind == 'datetime':
+        if opts.date_format == 'iso8601':
+            values = [v.isoformat() if v is not None else None for v in values]
+        else:
+            fmt = opts.date_format
+            values = [v.strftime(fmt) if v is not None else None for v in values]
+    elif kind == 'decimal':
+        precision = Decimal('0.' + '0' * (opts.precision - 1) + '1')
+        values = [str(Decimal(v).quantize(precision)) if v is not None else None
+                  for v in values]
+    elif kind == 'float':
+        decimals = opts.precision
+        values = [str(round(float(v), decimals)) if v is not None else None
+                  for v in values]
+    elif kind == 'static':
+        values = [opts.value] * len(values)
+    elif kind == 'nested':
+        indexes = [i for i, v in enumerate(values) if v is not None]
+        nested = field.get_mapper(as_class=True).many().serialize_batch(
+            [values[i] for i in indexes], role=opts.role)
+        values = [opts.null_default] * len(values)
+        for i, value in zip(indexes, nested):
+            values[i] = value
+    elif kind == 'collection':
+        # Serialize the items of every collection as a single column and split
+        # the result back into one list per row.
+        # Each collection is read once so iterators and queries aren't consumed
+        # or executed twice.
+        values = [list(value) if value is not None else None
+                  for value in values]
+        items = []
+        for value in values:
+            if value is not None:
+                items.extend(value)
+        items = iter(serialize_column(opts.field, items))
+        values = [[next(items) for _ in value] if value is not None else None
+                  for value in values]
+
+    if opts.default is not None:
+        default = opts.default
+        values = [default if v is None else v for v in values]
+
+    return values
+
+
+def serialize_batch(mapper, objs, fields, get_mapper):
+    """Serialize ``objs`` field by field rather than object by object.  The
+    source of each field is read for every object before the whole column is
+    converted by :func:`serialize_column` and written to the output rows.
+
+    Fields that can't be inlined run their serialize pipeline for each object
+    using ``mapper`` rebound to that object, or a mapper instance created for
+    each object when the mapper can't be rebound.
+
+    :param mapper: :class:`kim.mapper.Mapper` instance for the first object
+    :param objs: list of objects to serialize
+    :param fields: iterable of :class:`kim.field.Field` instances
+    :param get_mapper: function accepting ``obj`` and returning a new mapper
+    :returns: list of serialized objects
+    """
+
+    outputs = [{} for _ in objs]
+    session = mappers = None
+    rebindable = mapper._is_rebindable()
+
+    for field in fields:
+        opts = field.opts
+
+        if get_serialize_kind(field) is None:
+            if session is None:
+                session = Session()
+                if not rebindable:
+                    mappers = [mapper] + [get_mapper(obj=obj)
+                                          for obj in objs[1:]]
+            for i, (obj, output) in enumerate(zip(objs, outputs)):
+                if mappers is not None:
+                    m = mappers[i]
+                elif obj is not None:
+                    m = mapper.bind(obj=obj)
+                else:
+                    m = get_mapper(obj=obj)
+                field.serialize(m.get_mapper_session(obj, output),
+                                session=session)
+            continue
+
+        if opts.source == '__self__':
+            values = objs
+        else:
+            getter = mapper._accessors.get(opts.source, (opts.source_getter, ))[0]
+            values = [getter(obj) for obj in objs]
+
+        name = opts.output_name
+        for output, value in zip(outputs, serialize_column(field, values)):
+            output[name] = value
+
+    return outputs
+
+
+def get_marshal_pipes(field):
+    """Return the pipes the marshal plan has to run for ``field`` or None if the
+    field must be run through its marshal pipeline.
+
+    ``read_only``, ``get_data_from_name`` and ``update_output_to_source`` are
+    handled by the plan itself and pipes listed in :data:`PRUNABLE_PIPES` are
+    dropped when the field options make them a no-op.
+
+    :param field: :class:`kim.field.Field` instance
+    :rtype: tuple or None
+    :returns: tuple of pipe functions
+    """
+
+    from .field import Field
+
+    if _unbound(type(field).marshal) is not _unbound(Field.marshal):
+        return None
+
+    pipes = field.marshal_pipes
+    if len(pipes) < 3 or pipes[0] is not read_only or \
+            pipes[1] is not get_data_from_name or \
+            pipes[-1] is not update_output_to_source:
+        return None
+
+    return tuple(p for p in pipes[2:-1]
+                 if p not in PRUNABLE_PIPES or PRUNABLE_PIPES[p](field.opts))
+
+
+class MarshalPlan(object):
+    """A MarshalPlan marshals data for a fixed list of fields in a single pass.
+
+    read_only fields are removed when the plan is built and the checks made by
+    ``get_data_from_name`` are resolved from the field options once, leaving
+    only the validation and coercion pipes each field needs to run per call.
+    Fields that can't be planned are run through :meth:`kim.field.Field.marshal`.
+    """
+
+    __slots__ = ('steps', 'partial')
+
+    def __init__(self, fields, partial=False, accessors=None):
+        """Build the steps of the plan.
+
+        :param fields: iterable of :class:`kim.field.Field` instances
+        :param partial: only marshal fields present in the data.
+        :param accessors: dict mapping a field source to the getter and setter
+            used to access it on the output, see ``Mapper.__accessor__``.
+        """
+
+        self.partial = partial
+        self.steps = tuple(self._get_step(f, accessors or {}) for f in fields
+                           if not f.opts.read_only)
+
+    def _get_step(self, field, accessors):
+
+        opts = field.opts
+        pipes = get_marshal_pipes(field)
+
+        if opts.default is not None:
+            none_action = 'default'
+        elif opts.required:
+            none_action = 'required'
+        elif not opts.allow_none:
+            none_action = 'none_not_allowed'
+        else:
+            none_action = None
+
+        setter = accessors.get(opts.source, (None, None))[1]
+        steps = get_pipe_steps(pipes) if pipes is not None else None
+
+        return (field, opts.output_name, opts.name_getter, none_action, steps,
+                setter)
+
+    def run(self, mapper, data, output, fail_fast=False):
+        """Marshal ``data`` into ``output`` storing any errors in ``mapper.errors``.
+
+        :param mapper: the :class:`kim.mapper.Mapper` being marshaled
+        :param data: the data being marshaled
+        :param output: the object being marshaled to
+        :param fail_fast: stop at the first invalid field
+        :returns: None
+        """
+
+        errors = mapper._errors
+        mapper_session = mapper.get_mapper_session(data, output,
+                                                   fail_fast=fail_fast)
+        session = Session(collect_errors=True)
+        keys = set(data.keys()) if self.partial else None
+
+        for field, key, getter, none_action, steps, setter in self.steps:
+            if fail_fast and errors:
+                break
+            if keys is not None and key not in keys:
+                continue
+
+            try:
+                if steps is None:
+                    session.error = None
+                    field.marshal(mapper_session, session=session)
+                    if session.error is not None:
+                        errors[key] = session.error
+                    continue
+
+                value = getter(data)
+
+                if value is None and none_action is not None:
+                    if none_action == 'default':
+                        value = field.opts.default
+                    else:
+                        errors[key] = PendingError(field, none_action)
+                        continue
+
+                session.reset(field, value, output,
+                              mapper_session=mapper_session)
+                for pipe_func, run_if_none in steps:
+                    if (run_if_none or session.data is not None) and \
+                            (pipe_func(session) is INVALID or
+                             session.error is not None):
+                        break
+
+                if session.error is not None:
+                    errors[key] = session.error
+                elif setter is None:
+                    update_output_to_source(session)
+                else:
+                    setter(output, session.data)
+
+            except StopPipelineExecution:
+                pass
+            except FieldInvalid as e:
+                errors[key] = e.message
+            except MappingInvalid as e:
+                # handle errors from nested mappers.
+                errors[key] = e.pending_errors
@@ -20,12 +20,71 @@ class MapperError(KimException):
     pass
 
 
+class PendingError(object):
+    """An error recorded by a pipe whose message is only formatted when the
+    errors of :class:`MappingInvalid` are read.
+
+    .. seealso::
+        :meth:`kim.pipelines.base.Session.invalid`
+    """
+
+    __slots__ = ('field', 'error_type')
+
+    def __init__(self, field, error_type):
+
+        self.field = field
+        self.error_type = error_type
+
+    def __repr__(self):
+
+        return '<PendingError %s>' % self.error_type
+
+    def format(self):
+        """Return the error message of ``error_type`` for ``field``.
+
+        :rtype: str
+        """
+
+        return self.field.get_error(self.error_type)
+
+
+def format_errors(errors):
+    """Replace every :class:`PendingError` in ``errors`` with its message,
+    including the errors of nested mappers.  dicts are updated in place.
+
+    :param errors: dict of errors, an error message or a :class:`PendingError`
+    :returns: ``errors`` with every message formatted
+    """
+
+    if isinstance(errors, PendingError):
+        return errors.format()
+    elif isinstance(errors, dict):
+        for key, value in errors.items():
+            if isinstance(value, (PendingError, dict)):
+                errors[key] = format_errors(value)
+    return errors
+
+
 class MappingInvalid(KimException):
 
     def __init__(self, errors, *args, **kwargs):
-        self.errors = errors
+        self.pending_errors = errors
         super(MappingInvalid, self).__init__('Mapping invalid', *args, **kwargs)
 
+    @property
+    def errors(self):
+        """The errors raised while marshaling.  Messages recorded as a
+        :class:`PendingError` are formatted when this is read,
+        ``pending_errors`` holds the errors as they were recorded.
+        """
+
+        return format_errors(self.pending_errors)
+
+    @errors.setter
+    def errors(self, errors):
+
+        self.pending_errors = errors
+
 
 class RoleError(KimException):
     pass
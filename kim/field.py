@@ -5,10 +5,17 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
+import threading
+
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+
+import six
 
 from .exception import FieldError, FieldInvalid, FieldOptsError
-from .utils import set_creation_order
+from .utils import (
+    set_creation_order, _remove_escapes, _split_escape,
+    get_attr_or_key_getter, get_attr_or_key_setter)
 from .pipelines import (
     StringMarshalPipeline, StringSerializePipeline,
     StaticSerializePipeline,
@@ -20,7 +27,7 @@ from .pipelines import (
     DateMarshalPipeline, DateSerializePipeline,
     DecimalSerializePipeline, DecimalMarshalPipeline,
     FloatSerializePipeline, FloatMarshalPipeline)
-from .pipelines.base import run_pipeline, Session
+from .pipelines.base import run_pipeline, get_pipe_steps, Session
 from .pipelines.marshaling import MarshalPipeline
 from .pipelines.serialization import SerializePipeline
 
@@ -35,6 +42,64 @@ DEFAULT_ERROR_MSGS = {
 }
 
 
+class _PipeList(list):
+    """A list of pipes calling ``on_change`` whenever it's modified in place, so
+    a field can clear the steps it cached from the pipes.
+    """
+
+    __slots__ = ('_on_change', )
+
+    def __init__(self, pipes, on_change):
+
+        super(_PipeList, self).__init__(pipes)
+        self._on_change = on_change
+
+
+def _pipe_list_mutator(name):
+
+    method = getattr(list, name)
+
+    def mutator(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._on_change()
+        return result
+
+    mutator.__name__ = name
+    return mutator
+
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'reverse',
+              'sort', 'clear', '__setitem__', '__delitem__', '__iadd__',
+              '__imul__', '__setslice__', '__delslice__'):
+    if hasattr(list, _name):
+        setattr(_PipeList, _name, _pipe_list_mutator(_name))
+
+
+def _pipes_property(kind):
+    """Return a property storing the ``kind`` pipes of a field, clearing the
+    steps cached from them when they're replaced or modified in place.
+    """
+
+    pipes_attr, steps_attr = '_%s_pipes' % kind, '_%s_steps' % kind
+
+    def getter(self):
+        return getattr(self, pipes_attr)
+
+    def setter(self, pipes):
+        def on_change():
+            setattr(self, steps_attr, None)
+
+        setattr(self, pipes_attr, _PipeList(pipes, on_change))
+        on_change()
+
+    return property(getter, setter)
+
+
+# Guards creating the thread pool of a Collection's ``getter_pool`` when the
+# collection is first marshaled from several threads at once.
+_getter_pool_lock = threading.Lock()
+
+
 class FieldOpts(object):
     """FieldOpts are used to provide configuration options to :class:`.Field`.
     They are designed to allow users to easily provide custom configuration
@@ -170,6 +235,10 @@ class FieldOpts(object):
         name = bar
         source = baz
 
+        Once set, the unescaped ``output_name`` and the parsed ``name_path`` and
+        ``source_path`` are stored along with functions used to get and set
+        data using them.
+
         :param name: value of name property
         :param attribute_name: value of attribute_name property
         :param source: value of source property
@@ -180,6 +249,22 @@ class FieldOpts(object):
         self.name = self.name or name or self.attribute_name
         self.source = self.source or source or self.name
 
+        # Names are static once set, parse them now rather than each time a
+        # field reads or writes data.
+        if self.name:
+            self.output_name = _remove_escapes(self.name)
+            self.name_path = tuple(_split_escape(self.name))
+            self.name_getter = get_attr_or_key_getter(self.name_path)
+        else:
+            self.output_name = self.name_path = self.name_getter = None
+
+        if self.source:
+            self.source_path = tuple(_split_escape(self.source))
+            self.source_getter = get_attr_or_key_getter(self.source_path)
+            self.source_setter = get_attr_or_key_setter(self.source_path)
+        else:
+            self.source_path = self.source_getter = self.source_setter = None
+
     def get_name(self):
         """Return the name property set by :meth:`set_name`
 
@@ -224,6 +309,13 @@ class Field(object):
     #: The Fields serialization pipeline
     serialize_pipeline = SerializePipeline
 
+    #: The pipes run by :meth:`marshal`, :meth:`validate_data` and
+    #: :meth:`serialize`.  The steps computed from them are cached and cleared
+    #: when the pipes are replaced or modified in place.
+    marshal_pipes = _pipes_property('marshal')
+    validate_pipes = _pipes_property('validate')
+    serialize_pipes = _pipes_property('serialize')
+
     def __init__(self, *args, **field_opts):
         """Constructs a new instance of Field.  Each Field accepts a set of
         kwargs that will be passed directly to the fields
@@ -254,6 +346,9 @@ class Field(object):
         self.serialize_pipes = self.serialize_pipeline.get_pipeline(
             **self.opts.extra_serialize_pipes
         )
+        self.validate_pipes = self.marshal_pipeline.get_validation_pipeline(
+            **self.opts.extra_marshal_pipes
+        )
 
     def get_error(self, error_type):
         """Return the error message for ``error_type`` from the error messages defined on
@@ -329,19 +424,41 @@ class Field(object):
 
         :param mapper_session: The Mappers marshaling session this field is being
             run inside of.
-        :opts: kwargs passed to the marshal pipelines run method.
+        :opts: kwargs passed to the marshal pipelines run method.  Pass
+            ``session`` to reset and reuse an existing :class:`Session` rather
+            than creating a new one.
         :returns: None
 
         .. seealso::
             :meth:`kim.mapper.Mapper.marshal`
         """
 
-        parent = opts.get('parent_session', None)
-        session = Session(
-            self, mapper_session.data, mapper_session.output,
-            mapper_session=mapper_session,
-            parent=parent)
-        run_pipeline(self.marshal_pipes, session, self, **opts)
+        session = self._get_session(mapper_session, opts)
+        steps = self._marshal_steps
+        if steps is None:
+            steps = self._marshal_steps = get_pipe_steps(self._marshal_pipes)
+
+        run_pipeline(self._marshal_pipes, session, self, steps=steps, **opts)
+
+    def validate_data(self, mapper_session, **opts):
+        """Run the input and validation stages of the marshal :class:`Pipeline`
+        for this field without updating the output of the mapper_session.
+
+        :param mapper_session: The Mappers marshaling session this field is being
+            run inside of.
+        :opts: kwargs passed to the marshal pipelines run method.
+        :returns: None
+
+        .. seealso::
+            :meth:`kim.mapper.Mapper.validate_data`
+        """
+
+        session = self._get_session(mapper_session, opts)
+        steps = self._validate_steps
+        if steps is None:
+            steps = self._validate_steps = get_pipe_steps(self._validate_pipes)
+
+        run_pipeline(self._validate_pipes, session, self, steps=steps, **opts)
 
     def serialize(self, mapper_session, **opts):
         """Run the serialize :class:`Pipeline` for this field for the given `data` and
@@ -349,19 +466,43 @@ class Field(object):
 
         :param mapper_session: The Mappers marshaling session this field is being
             run inside of.
-        :opts: kwargs passed to the marshal pipelines run method.
+        :opts: kwargs passed to the marshal pipelines run method.  Pass
+            ``session`` to reset and reuse an existing :class:`Session` rather
+            than creating a new one.
         :returns: None
 
         .. seealso::
             :meth:`kim.mapper.Mapper.serialize`
         """
+
+        session = self._get_session(mapper_session, opts)
+        steps = self._serialize_steps
+        if steps is None:
+            steps = self._serialize_steps = get_pipe_steps(self._serialize_pipes)
+
+        run_pipeline(self._serialize_pipes, session, self, steps=steps, **opts)
+
+    def _get_session(self, mapper_session, opts):
+        """Return the :class:`Session` used to run a pipeline for this field,
+        resetting the ``session`` passed in ``opts`` if there is one.
+
+        :param mapper_session: The Mappers session this field is being run
+            inside of.
+        :param opts: kwargs passed to :meth:`marshal` or :meth:`serialize`,
+            ``session`` is removed from ``opts`` if present.
+        :returns: :class:`Session`
+        """
+
         parent = opts.get('parent_session', None)
-        session = Session(
-            self, mapper_session.data, mapper_session.output,
-            mapper_session=mapper_session,
-            parent=parent)
+        session = opts.pop('session', None)
+        if session is None:
+            return Session(
+                self, mapper_session.data, mapper_session.output,
+                mapper_session=mapper_session,
+                parent=parent)
 
-        run_pipeline(self.serialize_pipes, session, self, **opts)
+        return session.reset(self, mapper_session.data, mapper_session.output,
+                             parent=parent, mapper_session=mapper_session)
 
 
 class StringFieldOpts(FieldOpts):
@@ -587,6 +728,11 @@ class NestedFieldOpts(FieldOpts):
             the object to be set on this field, or None if it can't find one.
             This is useful where your API accepts simply `{'id': 2}` but you
             want a full object to be set
+        :param batch_getter: provide a function taking a list of pipeline
+            sessions which returns a dict mapping the index of each session in
+            the list to the object to be set for it.  When this field is wrapped
+            by a :class:`Collection` the function is called once with a session
+            for every item instead of calling ``getter`` for each item.
         :param allow_updates:  Allow existing objects returned by the ``getter`` function
             to be updated.
         :param allow_updates_in_place: Whereas allow_updates requires the getter to
@@ -601,6 +747,7 @@ class NestedFieldOpts(FieldOpts):
         self.role = kwargs.pop('role', '__default__')
         self.collection_class = kwargs.pop('collection_class', list)
         self.getter = kwargs.pop('getter', None)
+        self.batch_getter = kwargs.pop('batch_getter', None)
         self.allow_updates = kwargs.pop('allow_updates', False)
         self.allow_updates_in_place = kwargs.pop(
             'allow_updates_in_place', False)
@@ -687,6 +834,12 @@ class CollectionFieldOpts(FieldOpts):
             may be any :class:`Field` type.
         :param unique_on: Specify a key that is used to check the collection
             for duplicates.
+        :param getter_pool: Call the ``getter`` of a wrapped :class:`Nested` field
+            for every item concurrently.  Either the number of threads in a
+            pool created for this field or an object providing ``map()``, such
+            as a ``concurrent.futures.ThreadPoolExecutor``.  Pools created for
+            the field are shut down by :meth:`close_getter_pool`, pools passed
+            in are owned by the caller.
 
         """
         self.field = field
@@ -700,8 +853,42 @@ class CollectionFieldOpts(FieldOpts):
 
         self.field.opts._is_wrapped = True
         self.unique_on = kwargs.pop('unique_on', None)
+        self.getter_pool = kwargs.pop('getter_pool', None)
+        self._getter_pool = None
         super(CollectionFieldOpts, self).__init__(**kwargs)
 
+    def get_getter_pool(self):
+        """Return the pool used to call the getters of a wrapped :class:`Nested`
+        field, creating a thread pool the first time it's used if
+        ``getter_pool`` is the number of threads.
+
+        :returns: object providing ``map()``
+        """
+
+        if not isinstance(self.getter_pool, six.integer_types):
+            return self.getter_pool
+
+        if self._getter_pool is None:
+            with _getter_pool_lock:
+                if self._getter_pool is None:
+                    self._getter_pool = ThreadPool(self.getter_pool)
+        return self._getter_pool
+
+    def close_getter_pool(self):
+        """Shut down the thread pool created by :meth:`get_getter_pool`, waiting
+        for its threads to exit.  A new pool is created if the field is used
+        again.
+
+        :returns: None
+        """
+
+        with _getter_pool_lock:
+            pool, self._getter_pool = self._getter_pool, None
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+
     def set_name(self, *args, **kwargs):
         """proxy access to the :class:`FieldOpts` defined for
         this collections field.
@@ -5,6 +5,7 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
+import threading
 import warnings
 import weakref
 import six
@@ -12,11 +13,22 @@ import inspect
 
 from collections import OrderedDict, defaultdict
 
-from .exception import MapperError, MappingInvalid
+from .exception import MapperError, MappingInvalid, format_errors
 from .field import Field, FieldError, FieldInvalid
 from .role import whitelist, blacklist, Role
-from .utils import recursive_defaultdict, attr_or_key, _remove_escapes
-from .pipelines.base import pipe
+from .utils import (
+    recursive_defaultdict, attr_or_key, ACCESSORS, get_attr_or_key_getter,
+    get_attr_or_key_setter, LRUCache)
+from .pipelines.base import pipe, Session
+from .compiler import compile_serializer, serialize_batch, MarshalPlan
+from .stream import write_mapper, get_encoder, iter_json_array
+from .parallel import iter_serialized_chunks, get_pool
+
+
+#: Number of roles the fields, compiled serializers and marshal plans of a
+#: mapper class are cached for.  Roles built per request, such as a
+#: ``deferred_role`` read from a query string, evict the least recently used.
+ROLE_CACHE_SIZE = 256
 
 
 def mapper_is_defined(mapper_name):
@@ -107,6 +119,14 @@ class _MapperConfig(object):
                 whitelist(*self.cls.fields.keys())
 
         self._remove_fields()
+        self._bind_accessors()
+
+        # Fields resolved for a role and compiled serializers are generated
+        # lazily, per class, the first time a role is used.
+        # See :meth:`Mapper._get_role_fields` and :meth:`Mapper._get_serializer`
+        self.cls._field_cache = LRUCache(ROLE_CACHE_SIZE)
+        self.cls._compiled_serializers = LRUCache(ROLE_CACHE_SIZE)
+        self.cls._marshal_plans = LRUCache(ROLE_CACHE_SIZE)
 
         for base in reversed(self.cls.__mro__):
             self._set_polymorphic_base(base)
@@ -173,6 +193,40 @@ class _MapperConfig(object):
             if getattr(self.cls, name, None):
                 delattr(self.cls, name)
 
+    def _bind_accessors(self):
+        """Validate ``__accessor__`` and bind the functions used to get and set
+        the source of each field on the objects this mapper works with.
+
+        :raises: :class:`MapperError` if ``__accessor__`` is invalid or set
+            without ``__compile__``.
+        :returns: None
+        """
+
+        accessor = self.cls.__accessor__
+        if accessor not in ACCESSORS:
+            raise MapperError('__accessor__ must be one of %s, got %r' % (
+                ', '.join(sorted(ACCESSORS)), accessor))
+
+        # Field pipelines always check the type of the object, only compiled
+        # mappers use the accessor.
+        if accessor != 'auto' and not self.cls.__compile__:
+            raise MapperError('__accessor__ = %r requires __compile__ = True '
+                              'on %s' % (accessor, self.cls.__name__))
+
+        # auto uses the getters and setters stored on each field's opts.
+        self.cls._accessors = {}
+        if accessor == 'auto':
+            return
+
+        for field in self.cls.fields.values():
+            path = field.opts.source_path
+            if path is None or path == ('__self__', ):
+                continue
+
+            self.cls._accessors[field.opts.source] = (
+                get_attr_or_key_getter(path, accessor),
+                get_attr_or_key_setter(path, accessor))
+
     def _extract_defined_pipes(self, base):
         """Extract, process and store pipes defined using the decorator syntax
         on this mapper
@@ -307,14 +361,16 @@ class MapperSession(object):
     marshaling and serialization :class:`Pipeline`.
     """
 
-    __slots__ = ('mapper', 'data', 'output', 'partial')
+    __slots__ = ('mapper', 'data', 'output', 'partial', 'fail_fast')
 
-    def __init__(self, mapper, data, output, partial=None):
+    def __init__(self, mapper, data, output, partial=None, fail_fast=False):
         """Instantiate a new instance of :class:`MapperSession`
 
         :param mapper: :class:`Mapper <Mapper>` instance.
         :param data: The data marshaled by the :class:`Mapper`
         :param output: The object the :class:`Mapper` is outputting  to.
+        :param fail_fast: stop marshaling at the first invalid field, including
+            in nested mappers.
         :return: None
         :rtype: None
 
@@ -327,6 +383,86 @@ class MapperSession(object):
         self.data = data
         self.output = output
         self.partial = partial
+        self.fail_fast = fail_fast
+
+
+def _prepare_mapper(mapper_cls, roles, seen):
+    """Build the cached fields, compiled serializers and marshal plans of
+    ``mapper_cls`` for ``roles`` and every Nested mapper they use.
+
+    :param mapper_cls: :class:`Mapper` class
+    :param roles: names of the roles to prepare or None for every role
+    :param seen: set of the mapper and role pairs already prepared, allowing
+        mappers that nest themselves to be prepared.
+    :raises: :class:`MapperError`
+    :returns: None
+    """
+
+    if roles is None:
+        roles = list(mapper_cls.roles)
+
+    # The instance is only used to reach the caches stored on the class.
+    # PolymorphicMapper.__new__ is bypassed as there is no object to inspect.
+    mapper = object.__new__(mapper_cls)
+    Mapper.__init__(mapper, data={})
+
+    for role in roles:
+        key = (mapper_cls, role if isinstance(role, six.string_types) else id(role))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        fields = mapper._get_role_fields(role)[1]
+        if mapper_cls.__compile__:
+            mapper._get_serializer(role)
+            for partial in (False, True):
+                mapper.partial = partial
+                mapper._get_marshal_plan(role)
+            mapper.partial = False
+
+        for field in fields:
+            _prepare_field(field, seen)
+
+    if getattr(mapper_cls, '_polymorphic_base', False):
+        for identity in mapper_cls._polymorphic_identities.values():
+            if identity is not mapper_cls:
+                _prepare_mapper(identity, [r for r in roles if not isinstance(
+                    r, six.string_types) or r in identity.roles], seen)
+
+
+def _prepare_field(field, seen):
+    """Prepare the Nested mapper used by ``field`` or by the field wrapped by a
+    Collection.
+    """
+
+    wrapped = getattr(field.opts, 'field', None)
+    if isinstance(wrapped, Field):
+        _prepare_field(wrapped, seen)
+    elif hasattr(field, 'get_mapper'):
+        _prepare_mapper(field.get_mapper(as_class=True), [field.opts.role], seen)
+
+
+def _close_pools(mapper_cls, seen):
+    """Close the getter pools created by the Collections of ``mapper_cls`` and
+    of every Nested mapper it uses.
+
+    :param mapper_cls: :class:`Mapper` class
+    :param seen: set of the mapper classes already closed
+    :returns: None
+    """
+
+    if mapper_cls in seen:
+        return
+    seen.add(mapper_cls)
+
+    for field in mapper_cls.fields.values():
+        close_getter_pool = getattr(field.opts, 'close_getter_pool', None)
+        if close_getter_pool is not None:
+            close_getter_pool()
+
+        wrapped = getattr(field.opts, 'field', field)
+        if hasattr(wrapped, 'get_mapper'):
+            _close_pools(wrapped.get_mapper(as_class=True), seen)
 
 
 class Mapper(six.with_metaclass(MapperMeta, object)):
@@ -361,22 +497,119 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
     #: dictionary containing the role definitions for this mapper.
     __roles__ = {}
 
+    #: Serialize using a function generated for each role on first use and
+    #: marshal using a :class:`kim.compiler.MarshalPlan` rather than running the
+    #: full pipeline of every field.
+    __compile__ = False
+
+    #: How the fields of this mapper access the objects being serialized and
+    #: marshaled to.  One of ``auto``, ``attr`` or ``dict``.  ``auto`` supports
+    #: both objects and dicts, checking the type of the object each time a
+    #: value is accessed.  ``attr`` and ``dict`` require ``__compile__``.
+    __accessor__ = 'auto'
+
     @classmethod
     def many(cls, **mapper_params):
         """Provide access to a :class:`MapperIterator` to allow multiple
         items to be mapped by a mapper.
 
-        :param mapper_params: dict of params passed to each new instance of the mapper.
+        :param mapper_params: dict of params passed to each new instance of the
+            mapper along with the ``workers``, ``executor`` and ``chunk_size``
+            options of :class:`MapperIterator`.
         :return: :class:`MapperIterator <MapperIterator>` object
         :rtype: :class:`MapperIterator`
 
         Usage::
 
             >>> mapper = Mapper.many(data=data).marshal()
+            >>> with Mapper.many(workers=8, executor='process') as mappers:
+            ...     mappers.serialize(objs)
         """
 
         return MapperIterator(cls, **mapper_params)
 
+    @classmethod
+    def prepare(cls, roles=None):
+        """Resolve and cache the fields of ``roles``, compile them when
+        ``__compile__`` is set and prepare every Nested mapper they use.
+
+        Mappers build these caches the first time a role is used.  Calling
+        ``prepare`` when an application starts means requests served from
+        many threads only ever read them.
+
+        :param roles: names of the roles to prepare, defaults to every role
+            in ``roles``.
+        :raises: :class:`MapperError`
+        :returns: this Mapper class
+
+        Usage::
+
+            >>> UserMapper.prepare()
+            >>> UserMapper.prepare(roles=['public'])
+        """
+
+        _prepare_mapper(cls, roles, set())
+        return cls
+
+    @classmethod
+    def close_pools(cls):
+        """Shut down the thread pools created for the ``getter_pool`` of the
+        Collections of this Mapper and of every Nested mapper it uses.  Call it
+        when your application shuts down, pools are created again if the
+        mapper is used afterwards.
+
+        :returns: None
+
+        Usage::
+
+            >>> PostMapper.close_pools()
+        """
+
+        _close_pools(cls, set())
+
+    @classmethod
+    def serialize_obj(cls, obj, role='__default__', deferred_role=None,
+                      **mapper_params):
+        """Serialize ``obj`` without keeping a Mapper around.  Each call uses
+        its own Mapper so this is safe to call from many threads at once.
+
+        :param obj: the object to serialize
+        :param role: the name of a role as a string or a :class:`Role` instance.
+        :param deferred_role: an instance of role used to dynamically a new role.
+        :param mapper_params: kwargs passed to the Mapper such as ``raw``
+        :raises: :class:`MapperError`
+        :returns: dict containing serialized object
+
+        Usage::
+
+            >>> UserMapper.serialize_obj(user, role='public')
+        """
+
+        return cls(obj=obj, **mapper_params).serialize(
+            role=role, deferred_role=deferred_role)
+
+    @classmethod
+    def marshal_data(cls, data, role='__default__', fail_fast=False,
+                     **mapper_params):
+        """Marshal ``data`` without keeping a Mapper around.  Each call uses
+        its own Mapper so this is safe to call from many threads at once.
+
+        :param data: input data to marshal
+        :param role: the name of a role as a string or a :class:`Role` instance.
+        :param fail_fast: stop at the first invalid field, see :meth:`marshal`
+        :param mapper_params: kwargs passed to the Mapper such as ``obj`` or
+            ``partial``
+        :raises: :class:`MappingInvalid`
+        :returns: Object of ``__type__`` populated with data
+
+        Usage::
+
+            >>> user = UserMapper.marshal_data(request.json)
+        """
+
+        return cls(data=data, **mapper_params).marshal(
+            role=role, fail_fast=fail_fast)
+
     def __init__(self, obj=None, data=None, partial=False, raw=False,
                  parent=None):
         """Initialise a Mapper with the object and/or the data to be
@@ -409,6 +642,65 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         self.partial = partial
         self.parent = parent
 
+    def bind(self, obj=None, data=None):
+        """Rebind this Mapper to a new ``obj`` and/or ``data`` so a single
+        instance can be reused to map many objects.  Any errors from a
+        previous call to :meth:`marshal` are cleared, ``raw``, ``partial`` and
+        ``parent`` are kept.
+
+        :param obj: the object to be serialized, or updated by marshaling
+        :param data: input data to be used for marshaling
+        :raises: :class:`MapperError`
+        :returns: this Mapper
+
+        Usage::
+
+            >>> mapper = UserMapper(obj=users[0])
+            >>> [mapper.bind(obj=user).serialize() for user in users]
+        """
+
+        if obj is None and data is None:
+            raise MapperError(
+                'At least one of obj or data must be passed to %s.bind()'
+                % self.__class__.__name__)
+
+        self.obj = obj
+        self.data = data
+        self.errors = {}
+        return self
+
+    @property
+    def errors(self):
+        """The errors found by :meth:`marshal` keyed by field name.  Messages
+        are formatted the first time they are read.
+        """
+
+        return format_errors(self._errors)
+
+    @errors.setter
+    def errors(self, errors):
+
+        self._errors = errors
+
+    @classmethod
+    def _is_rebindable(cls):
+        """Return True if instances of this Mapper can be reused for many
+        objects using :meth:`bind`.  Polymorphic base mappers return a
+        different Mapper depending on the object and Mappers overriding
+        ``__init__`` without overriding ``bind`` may hold state set per
+        object, both are constructed for each object instead.
+
+        :rtype: bool
+        """
+
+        if getattr(cls, '_polymorphic_base', False):
+            return False
+
+        return (six.get_unbound_function(cls.__init__) is
+                six.get_unbound_function(Mapper.__init__) or
+                six.get_unbound_function(cls.bind) is not
+                six.get_unbound_function(Mapper.bind))
+
     @property
     def initial_errors(self):
 
@@ -493,21 +785,73 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         else:
             return role
 
-    def _field_in_data(self, field):
-        """Validate if a field.name appears in the provided data
+    def _get_role_fields(self, name_or_role, deferred_role=None):
+        """Return the fields permitted by a role along with the key they are
+        cached against.
 
-        :param field: :class:`Field` instance
-        :returns: Boolean
-        :rtype: boolean
+        :param name_or_role: the name of a role as a string or a :class:`Role` instance.
+        :param deferred_role: an instance of role used to dynamically a new role.
+        :raises: :class:`MapperError`
+        :returns: tuple of the cache key and a tuple of :class:`Field` instances
+        :rtype: tuple
+
+        .. seealso::
+            :meth:`_get_role_entry`
+        """
+
+        key, cached = self._get_role_entry(
+            name_or_role, deferred_role=deferred_role)
+        return key, cached[1]
+
+    def _get_role_entry(self, name_or_role, deferred_role=None):
+        """Return the entry cached for the fields permitted by a role along with
+        the key it's cached against.
+
+        Resolved fields are cached on the mapper class.  Roles passed by name
+        are cached against the name and recomputed if the role stored in
+        ``roles`` is replaced.  :class:`Role` instances passed directly and
+        ``deferred_role`` are cached against the field names they contain.
+        At most :data:`ROLE_CACHE_SIZE` roles are cached, the least recently
+        used is discarded first.
+
+        :param name_or_role: the name of a role as a string or a :class:`Role` instance.
+        :param deferred_role: an instance of role used to dynamically a new role.
+        :raises: :class:`MapperError`
+        :returns: tuple of the cache key and a tuple of the role marker, the
+            fields, the fields marshaled and their output names.
+        :rtype: tuple
         """
-        for key in self.data.keys():
-            if key == _remove_escapes(field.name):
-                return True
-        return False
+
+        role_key = deferred_key = marker = None
+
+        if isinstance(name_or_role, six.string_types):
+            role_key = name_or_role
+            marker = self.roles.get(name_or_role)
+        elif isinstance(name_or_role, Role):
+            role_key = (frozenset(name_or_role), name_or_role.whitelist)
+
+        if isinstance(deferred_role, Role):
+            deferred_key = (frozenset(deferred_role), deferred_role.whitelist)
+
+        key = (role_key, deferred_key)
+        cached = self._field_cache.get(key)
+        if cached is not None and cached[0] is marker and \
+                (deferred_role is None or deferred_key is not None):
+            return key, cached
+
+        role = self._get_role(name_or_role, deferred_role=deferred_role)
+        fields = tuple(f for name, f in six.iteritems(self.fields) if name in role)
+        # read_only fields would stop their marshal pipeline straight away.
+        marshal_fields = tuple(f for f in fields if not f.opts.read_only)
+        names = tuple(f.opts.output_name for f in marshal_fields)
+        cached = self._field_cache[key] = (marker, fields, marshal_fields, names)
+
+        return key, cached
 
     def _get_fields(self, name_or_role, deferred_role=None, for_marshal=False):
         """Returns a list of :class:`Field` instances providing they are
-        registered in the specified :class:`Role`.
+        registered in the specified :class:`Role`.  read_only fields are
+        excluded when marshaling.
 
         If the provided name_or_role is not found in the Mappers role list an
         error will be raised.
@@ -520,17 +864,21 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         :rtype: list
         """
 
-        role = self._get_role(name_or_role, deferred_role=deferred_role)
+        fields, marshal_fields, names = self._get_role_entry(
+            name_or_role, deferred_role=deferred_role)[1][1:]
 
-        fields = [f for name, f in six.iteritems(self.fields) if name in role]
+        if not for_marshal:
+            return list(fields)
 
-        if self.partial and for_marshal:
+        if self.partial:
             # If this is a partial update, rather than going through all fields
             # in the role, select those fields which are actually present in
             # the data - as long as they're also present in the role.
-            return [f for f in fields if self._field_in_data(f)]
+            data_keys = set(self.data.keys())
+            return [f for f, name in zip(marshal_fields, names)
+                    if name in data_keys]
         else:
-            return fields
+            return list(marshal_fields)
 
     def _data_supports_transform(self, data):
         """return a boolean indicating if the given data object supports key
@@ -610,16 +958,18 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
 
         return self._remove_none(output)
 
-    def get_mapper_session(self, data, output):
+    def get_mapper_session(self, data, output, fail_fast=False):
         """Populate and return a new instance of :class:`MapperSession`
 
         :param data: data being Mapped
         :param output: obj mapper is mapping too
+        :param fail_fast: stop marshaling at the first invalid field
         :return: :class:`MapperSession <MapperSession>` object
         :rtype: :class:`MapperSession` object
         """
 
-        return MapperSession(self, data, output, partial=self.partial)
+        return MapperSession(self, data, output, partial=self.partial,
+                             fail_fast=fail_fast)
 
     def serialize(self, role='__default__', raw=False, deferred_role=None):
         """Serialize ``self.obj`` into a dict according to the fields
@@ -652,16 +1002,85 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         if transform_data:
             data = self.transform_data(data)
 
+        # transform_data returns a dict, which the accessors of a compiled
+        # serializer may not be able to read.
+        if self.__compile__ and not transform_data:
+            return self._get_serializer(role, deferred_role)(self, data)
+
+        fields = self._get_role_fields(role, deferred_role=deferred_role)[1]
         mapper_session = self.get_mapper_session(data, output)
-        for field in self._get_fields(role, deferred_role=deferred_role):
-            field.serialize(mapper_session)
+        session = Session()
+        for field in fields:
+            field.serialize(mapper_session, session=session)
 
         return output
 
-    def marshal(self, role='__default__'):
+    def serialize_to(self, stream, role='__default__', deferred_role=None,
+                     encoder=None):
+        """Serialize ``self.obj`` as JSON, writing each field to ``stream`` as
+        soon as it's serialized rather than building the output in memory.
+
+        Nested fields and Collections of Nested fields are written to the
+        stream recursively.
+
+        :param stream: file-like object accepting str via ``write()``
+        :param role: the name of a role as a string or a :class:`Role` instance.
+        :param deferred_role: an instance of role used to dynamically a new role.
+        :param encoder: optional :class:`json.JSONEncoder` instance used to encode
+            serialized values.
+        :raises: :class:`MapperError`
+        :returns: None
+
+        Usage::
+
+            >>> with open('user.json', 'w') as f:
+            ...     UserMapper(obj=user).serialize_to(f, role='public')
+
+        .. seealso::
+            :func:`kim.stream.write_mapper`
+        """
+
+        if self.obj is None:
+            raise MapperError(
+                'Attmpted to serialize None, have you passed a valid obj param to %s()?'
+                % self.__class__.__name__)
+
+        write_mapper(self, stream, get_encoder(encoder), role=role,
+                     deferred_role=deferred_role)
+
+    def _get_serializer(self, role, deferred_role=None):
+        """Return the compiled serialize function for the fields permitted by
+        ``role`` and ``deferred_role``, compiling it the first time they are used.
+
+        :param role: the name of a role as a string or a :class:`Role` instance.
+        :param deferred_role: an instance of role used to dynamically a new role.
+        :raises: :class:`MapperError`
+        :returns: function accepting this mapper and the obj being serialized.
+
+        .. seealso::
+            :func:`kim.compiler.compile_serializer`
+        """
+
+        key, fields = self._get_role_fields(role, deferred_role=deferred_role)
+
+        cached = self._compiled_serializers.get(key)
+        if cached is not None and cached[0] is fields:
+            return cached[1]
+
+        role_name = role if isinstance(role, six.string_types) else 'role'
+        serializer = compile_serializer(self.__class__, role_name, fields)
+        self._compiled_serializers[key] = (fields, serializer)
+        return serializer
+
+    def marshal(self, role='__default__', fail_fast=False):
         """Marshal ``self.data`` into ``self.obj`` according to the fields
         defined on this Mapper.
 
+        :param role: name of a role to use when marshaling
+        :param fail_fast: stop at the first invalid field, skipping the
+            remaining fields and :meth:`validate`.  ``errors`` then only
+            contains the first error.  Nested mappers stop early too.
+        :raises: :class:`MappingInvalid`
         :returns: Object of ``__type__`` populated with data
         """
 
@@ -673,31 +1092,157 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         output = self._get_obj()
         data = self.data
 
-        fields = self._get_fields(role, for_marshal=True)
+        if self.__compile__:
+            self._get_marshal_plan(role).run(self, data, output,
+                                             fail_fast=fail_fast)
+        else:
+            self._marshal_fields(role, self.get_mapper_session(
+                data, output, fail_fast=fail_fast))
 
-        for field in fields:
+        if fail_fast and self._errors:
+            raise MappingInvalid(self._errors)
+
+        return self._validate_output(output)
+
+    def validate_data(self, role='__default__', fail_fast=False):
+        """Check ``self.data`` against the fields defined on this Mapper without
+        marshaling it.  Only the input and validation pipes of each field are
+        run, ``__type__`` is never instantiated and Nested fields validate
+        their data without calling their getter or creating nested objects.
+
+        :meth:`validate` isn't called as it expects the marshaled object.
+
+        :param role: name of a role to use when validating
+        :param fail_fast: stop at the first invalid field, see :meth:`marshal`
+        :returns: dict of errors keyed by field name, empty if ``self.data`` is
+            valid.
+
+        Usage::
+
+            >>> errors = UserMapper(data=message).validate_data()
+        """
+
+        if self.initial_errors is not None:
+            return self.initial_errors
+
+        output = self.obj if self.obj is not None else {}
+        self._marshal_fields(role, self.get_mapper_session(
+            self.data, output, fail_fast=fail_fast), validate_only=True)
+
+        return self.errors
+
+    def _marshal_fields(self, role, mapper_session, validate_only=False):
+        """Marshal each field permitted by ``role`` storing any errors in
+        ``errors``.
+
+        :param role: name of a role to use when marshaling
+        :param mapper_session: the :class:`MapperSession` of this call
+        :param validate_only: only run the input and validation pipes of each
+            field, see :meth:`validate_data`
+        :returns: None
+        """
+
+        fail_fast = mapper_session.fail_fast
+        session = Session(collect_errors=True)
+        for field in self._get_fields(role, for_marshal=True):
+            if fail_fast and self._errors:
+                break
+
+            session.error = None
             try:
-                field.marshal(self.get_mapper_session(data, output))
+                if validate_only:
+                    field.validate_data(mapper_session, session=session)
+                else:
+                    field.marshal(mapper_session, session=session)
             except FieldInvalid as e:
-                self.errors[_remove_escapes(field.name)] = e.message
+                self._errors[field.opts.output_name] = e.message
             except MappingInvalid as e:
                 # handle errors from nested mappers.
-                self.errors[_remove_escapes(field.name)] = e.errors
+                self._errors[field.opts.output_name] = e.pending_errors
+            else:
+                if session.error is not None:
+                    self._errors[field.opts.output_name] = session.error
+
+    def _validate_output(self, output):
+        """Run the top level :meth:`validate` on ``output`` once every field has
+        been marshaled, raising any errors found while marshaling.
+
+        :param output: the marshaled object
+        :raises: :class:`MappingInvalid`
+        :returns: ``output``
+        """
 
         # Call top level mapper validator for validations involving more
         # than one field
         try:
             self.validate(output)
         except FieldInvalid as e:
-            self.errors[_remove_escapes(e.field.name)] = e.message
+            self._errors[e.field.opts.output_name] = e.message
         except MappingInvalid as e:
-            self.errors = e.errors
+            self._errors = e.pending_errors
 
-        if self.errors:
-            raise MappingInvalid(self.errors)
+        if self._errors:
+            raise MappingInvalid(self._errors)
 
         return output
 
+    def marshal_async(self, role='__default__'):
+        """Marshal ``self.data`` like :meth:`marshal`, awaiting any async pipes
+        and Nested getters.  Requires Python 3.5+.
+
+        :param role: the name of a role as a string or a :class:`Role` instance.
+        :returns: awaitable returning the object of ``__type__`` populated with
+            data
+
+        Usage::
+
+            >>> user = await UserMapper(data=data).marshal_async()
+
+        .. seealso::
+            :func:`kim.aio.marshal_async`
+        """
+
+        from .aio import marshal_async
+        return marshal_async(self, role=role)
+
+    def serialize_async(self, role='__default__', raw=False, deferred_role=None):
+        """Serialize ``self.obj`` like :meth:`serialize`, awaiting any async
+        pipes.  Requires Python 3.5+.
+
+        :param role: specify the role to use when serializing this mapper
+        :param raw: instruct the mapper to transform the data before serializing.
+        :param deferred_role: an instance of role used to dynamically a new role.
+        :returns: awaitable returning the serialized object
+
+        .. seealso::
+            :func:`kim.aio.serialize_async`
+        """
+
+        from .aio import serialize_async
+        return serialize_async(self, role=role, raw=raw,
+                               deferred_role=deferred_role)
+
+    def _get_marshal_plan(self, role):
+        """Return the :class:`kim.compiler.MarshalPlan` for the fields permitted
+        by ``role``, building it the first time the role is marshaled.  Plans are
+        stored separately for partial and full marshaling.
+
+        :param role: the name of a role as a string or a :class:`Role` instance.
+        :raises: :class:`MapperError`
+        :returns: :class:`kim.compiler.MarshalPlan`
+        """
+
+        key, fields = self._get_role_fields(role)
+        key = (key, bool(self.partial))
+
+        cached = self._marshal_plans.get(key)
+        if cached is not None and cached[0] is fields:
+            return cached[1]
+
+        plan = MarshalPlan(fields, partial=key[1], accessors=self._accessors)
+        self._marshal_plans[key] = (fields, plan)
+        return plan
+
     def validate(self, output):
         """Mappers may subclass this method to perform top-level validation
         on multiple related fields, raising `FieldInvalid` or `MappingInvalid`
@@ -874,15 +1419,80 @@ class MapperIterator(object):
         results = UserMapper.many().serialize(objs)
     """
 
-    def __init__(self, mapper, **mapper_params):
+    def __init__(self, mapper, workers=None, executor='process', chunk_size=1000,
+                 **mapper_params):
         """Constructs a new instance of a MapperIterator.
 
         :param mapper: a :class:`.Mapper` to map each item too.
+        :param workers: serialize objects across a pool of this many workers.
+            The pool is created the first time it's used and shut down by
+            :meth:`close`.
+        :param executor: the type of pool used when ``workers`` is set, either
+            ``process`` or ``thread``.  A pool providing ``apply_async`` or an
+            executor providing ``submit`` owned by the caller may be passed
+            instead, it's used whether or not ``workers`` is set and isn't
+            closed by :meth:`close`.
+        :param chunk_size: number of objects sent to a worker at a time.
         :param mapper_params: a dict of kwargs passed to each mapper
         """
 
         self.mapper = mapper
+        self.workers = workers
+        self.executor = executor
+        self.chunk_size = chunk_size
         self.mapper_params = mapper_params
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    def _is_parallel(self):
+        """Return True if objects are serialized using :meth:`get_pool`."""
+
+        return bool(self.workers) or \
+            not isinstance(self.executor, six.string_types)
+
+    def get_pool(self):
+        """Return the pool objects are serialized across, creating a pool of
+        ``workers`` workers the first time it's called unless ``executor`` is a
+        pool owned by the caller.
+
+        :raises: :class:`MapperError`
+        :returns: pool or executor
+        """
+
+        if not isinstance(self.executor, six.string_types):
+            return self.executor
+
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = get_pool(self.executor, self.workers)
+            return self._pool
+
+    def close(self):
+        """Shut down the pool created for ``workers``, waiting for its workers
+        to exit.  A pool passed as ``executor`` is left open.
+
+        :returns: None
+
+        Usage::
+
+            >>> with UserMapper.many(workers=8) as mappers:
+            ...     results = mappers.serialize(users)
+        """
+
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.close()
+            pool.join()
 
     def get_mapper(self, data=None, obj=None):
         """Return a new instance of the provided mapper.
@@ -894,14 +1504,44 @@ class MapperIterator(object):
         :returns: a new :class:`.Mapper`
         """
 
-        self.mapper_params.update({
-            'data': data,
-            'obj': obj
-        })
-        return self.mapper(**self.mapper_params)
+        mapper_params = dict(self.mapper_params, data=data, obj=obj)
+        return self.mapper(**mapper_params)
+
+    def _iter_mappers(self, objs=None, data=None):
+        """Yield a mapper for each item of ``objs`` or ``data``.  A single
+        mapper is rebound to each item using :meth:`Mapper.bind` when
+        the mapper supports it, otherwise a new mapper is created each time.
+
+        Each mapper must be finished with before the next one is requested.
+
+        :param objs: iterable of objects to serialize
+        :param data: iterable of data to marshal
+        :returns: generator of :class:`.Mapper`
+        """
+
+        key, items = ('obj', objs) if data is None else ('data', data)
+
+        if not self.mapper._is_rebindable():
+            for item in items:
+                yield self.get_mapper(**{key: item})
+            return
+
+        mapper = None
+        for item in items:
+            if mapper is None:
+                mapper = self.get_mapper(**{key: item})
+            else:
+                mapper.bind(**{key: item})
+            yield mapper
 
     def serialize(self, objs, role='__default__', deferred_role=None):
-        """Serializes each item in ``objs`` creating a new mapper each time.
+        """Serializes each item in ``objs`` using a mapper rebound to each item.
+
+        When ``workers`` is set ``objs`` is split into chunks of ``chunk_size``
+        objects serialized in parallel by a pool of workers.  Each worker
+        resolves the mapper from the registry by name and returns the
+        serialized objects of its chunk, the results are returned in the order
+        of ``objs``.
 
         :param objs: iterable of objects to serialize
         :param role: name of a role to use when serializing
@@ -909,25 +1549,163 @@ class MapperIterator(object):
         :returns: list of serialized objects
         """
 
-        output = []  # TODO should this be user defined?
-        for obj in objs:
-            output.append(self.get_mapper(obj=obj).serialize(
-                role=role,
-                deferred_role=deferred_role))
+        return list(self.iter_serialize(
+            objs, role=role, deferred_role=deferred_role))
 
-        return output
+    def iter_serialize(self, objs, role='__default__', deferred_role=None):
+        """Serializes each item in ``objs`` using a mapper rebound to each item,
+        yielding each result as soon as it's serialized.
+
+        ``objs`` is consumed lazily allowing large result sets, such as a
+        SQLAlchemy ``Query.yield_per()``, to be serialized without holding
+        every object or result in memory.
+
+        :param objs: iterable of objects to serialize
+        :param role: name of a role to use when serializing
+        :param deferred_role: an instance of role used to dynamically a new role.
+
+        :returns: generator of serialized objects
+        """
+
+        if self._is_parallel():
+            for chunk in iter_serialized_chunks(
+                    self, objs, role=role, deferred_role=deferred_role):
+                for result in chunk:
+                    yield result
+            return
+
+        for mapper in self._iter_mappers(objs=objs):
+            yield mapper.serialize(role=role, deferred_role=deferred_role)
+
+    def serialize_to(self, objs, stream, role='__default__', deferred_role=None,
+                     encoder=None):
+        """Serialize each item in ``objs`` as a JSON array written to ``stream``
+        one item at a time.
+
+        :param objs: iterable of objects to serialize
+        :param stream: file-like object accepting str via ``write()``
+        :param role: name of a role to use when serializing
+        :param deferred_role: an instance of role used to dynamically a new role.
+        :param encoder: optional :class:`json.JSONEncoder` instance used to encode
+            serialized values.
+        :returns: None
+
+        .. seealso::
+            :meth:`Mapper.serialize_to`
+        """
+
+        encode = get_encoder(encoder)
+
+        stream.write('[')
+        if self._is_parallel():
+            for i, chunk in enumerate(iter_serialized_chunks(
+                    self, objs, role=role, deferred_role=deferred_role,
+                    encode=True)):
+                if i:
+                    stream.write(', ')
+                stream.write(chunk)
+            stream.write(']')
+            return
+
+        for i, mapper in enumerate(self._iter_mappers(objs=objs)):
+            if i:
+                stream.write(', ')
+            write_mapper(mapper, stream, encode, role=role,
+                         deferred_role=deferred_role)
+        stream.write(']')
+
+    def serialize_batch(self, objs, role='__default__', deferred_role=None):
+        """Serializes ``objs`` one field at a time.  The value of a field is read
+        from every object and converted as a single column before moving on to
+        the next field, amortizing the cost of running the pipeline of each
+        field for each object.
+
+        Polymorphic mappers, raw mode and mappers overriding ``serialize`` are
+        serialized one object at a time using :meth:`serialize`.
+
+        :param objs: iterable of objects to serialize
+        :param role: name of a role to use when serializing
+        :param deferred_role: an instance of role used to dynamically a new role.
 
-    def marshal(self, data, role='__default__'):
-        """Marshals each item in ``data`` creating a new mapper each time.
+        :returns: list of serialized objects
+
+        .. seealso::
+            :func:`kim.compiler.serialize_batch`
+        """
+
+        objs = list(objs)
+        if not objs:
+            return []
+
+        mapper = self.get_mapper(obj=objs[0])
+        if (mapper.__class__ is not self.mapper or mapper.raw or
+                getattr(self.mapper, '_polymorphic_base', False) or
+                six.get_unbound_function(self.mapper.serialize) is not
+                six.get_unbound_function(Mapper.serialize)):
+            return self.serialize(objs, role=role, deferred_role=deferred_role)
+
+        fields = mapper._get_role_fields(role, deferred_role=deferred_role)[1]
+        return serialize_batch(mapper, objs, fields, self.get_mapper)
+
+    def marshal(self, data, role='__default__', fail_fast=False):
+        """Marshals each item in ``data`` using a mapper rebound to each item.
 
         :param objs: iterable of objects to marshal
         :param role: name of a role to use when marshaling
+        :param fail_fast: stop at the first invalid field of the first invalid
+            item, see :meth:`Mapper.marshal`
 
         :returns: list of marshaled objects
         """
 
-        output = []  # TODO should this be user defined?
-        for datum in data:
-            output.append(self.get_mapper(data=datum).marshal(role=role))
+        return list(self.iter_marshal(data, role=role, fail_fast=fail_fast))
 
-        return output
+    def marshal_stream(self, stream, role='__default__', chunk_size=65536,
+                       fail_fast=False):
+        """Marshal each element of a JSON array read from ``stream`` as soon as
+        it's parsed, allowing very large request bodies to be marshaled without
+        loading them into memory.
+
+        Each item is yielded as a tuple of the marshaled object and None or,
+        if the item is invalid, None and the errors raised by the mapper.
+
+        :param stream: file-like object returning bytes or str from ``read()``
+        :param role: name of a role to use when marshaling
+        :param chunk_size: number of bytes read from ``stream`` at a time.
+        :param fail_fast: stop marshaling each item at its first invalid field,
+            see :meth:`Mapper.marshal`
+        :raises: :class:`MapperError` if ``stream`` is not a valid JSON array
+        :returns: generator of (obj, errors) tuples
+
+        Usage::
+
+            >>> for obj, errors in UserMapper.many().marshal_stream(request.stream):
+            ...     if errors is None:
+            ...         db.session.add(obj)
+
+        .. seealso::
+            :func:`kim.stream.iter_json_array`
+        """
+
+        data = iter_json_array(stream, chunk_size=chunk_size)
+        for mapper in self._iter_mappers(data=data):
+            try:
+                yield mapper.marshal(role=role, fail_fast=fail_fast), None
+            except MappingInvalid as e:
+                yield None, e.errors
+
+    def iter_marshal(self, data, role='__default__', fail_fast=False):
+        """Marshals each item in ``data`` using a mapper rebound to each item,
+        yielding each object as soon as it's marshaled.
+
+        :param data: iterable of data to marshal
+        :param role: name of a role to use when marshaling
+        :param fail_fast: stop at the first invalid field of an item, see
+            :meth:`Mapper.marshal`
+
+        :raises: :class:`kim.exception.MappingInvalid`
+        :returns: generator of marshaled objects
+        """
+
+        for mapper in self._iter_mappers(data=data):
+            yield mapper.marshal(role=role, fail_fast=fail_fast)
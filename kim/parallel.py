@@ -0,0 +1,154 @@
+# kim/parallel.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+from collections import deque
+from importlib import import_module
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+
+from six import StringIO
+
+from .exception import MapperError
+from .stream import write_mapper, get_encoder
+
+
+#: Pools available to :class:`kim.mapper.MapperIterator` when ``workers`` is set.
+EXECUTORS = {
+    'process': Pool,
+    'thread': ThreadPool,
+}
+
+
+#: Number of chunks per worker submitted to a pool before waiting for the
+#: oldest one, bounding the objects and results held in memory.
+CHUNKS_PER_WORKER = 2
+
+
+def iter_chunks(iterable, chunk_size):
+    """Split ``iterable`` into lists of at most ``chunk_size`` items, consuming
+    it lazily.
+
+    :param iterable: iterable to split
+    :param chunk_size: maximum length of each chunk
+    :returns: generator of lists
+    """
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_pool(executor, workers):
+    """Create a pool of ``workers`` workers of the type named by ``executor``.
+
+    :param executor: key of :data:`EXECUTORS`
+    :param workers: number of workers in the pool
+    :raises: :class:`MapperError`
+    :returns: :class:`multiprocessing.pool.Pool`
+    """
+
+    try:
+        pool_cls = EXECUTORS[executor]
+    except KeyError:
+        raise MapperError('executor must be one of %s, got %r' % (
+            ', '.join(sorted(EXECUTORS)), executor))
+
+    return pool_cls(workers)
+
+
+def serialize_chunk(args):
+    """Serialize a chunk of objects inside a worker, returning a list of the
+    serialized objects or, when ``encode`` is set, the encoded JSON of each
+    object separated by commas.
+
+    The mapper is resolved from the registry by name after importing the module
+    it's defined in, so workers started without forking can find it.
+
+    :param args: tuple of the mapper module and name, the params passed to
+        each mapper, the objects to serialize, role, deferred_role and encode.
+    :returns: list or str
+    """
+
+    from .mapper import get_mapper_from_registry
+
+    module, name, mapper_params, objs, role, deferred_role, encode = args
+    import_module(module)
+    mapper = get_mapper_from_registry(name)
+
+    if not encode:
+        return [mapper(obj=obj, **mapper_params).serialize(
+                    role=role, deferred_role=deferred_role) for obj in objs]
+
+    stream = StringIO()
+    encode = get_encoder()
+    for i, obj in enumerate(objs):
+        if i:
+            stream.write(', ')
+        write_mapper(mapper(obj=obj, **mapper_params), stream, encode,
+                     role=role, deferred_role=deferred_role)
+
+    return stream.getvalue()
+
+
+def _submit(pool, task):
+    """Submit ``task`` to a multiprocessing pool or a concurrent.futures
+    executor, returning a function that waits for its result.
+    """
+
+    if hasattr(pool, 'apply_async'):
+        return pool.apply_async(serialize_chunk, (task,)).get
+    return pool.submit(serialize_chunk, task).result
+
+
+def iter_serialized_chunks(mapper_iterator, objs, role='__default__',
+                           deferred_role=None, encode=False):
+    """Serialize ``objs`` using the pool of ``mapper_iterator``, yielding the
+    results of each chunk in the order of ``objs``.  ``objs`` is consumed
+    lazily, at most :data:`CHUNKS_PER_WORKER` chunks per worker are sent to
+    the pool before the results of the oldest chunk are yielded.
+
+    :param mapper_iterator: :class:`kim.mapper.MapperIterator` instance
+    :param objs: iterable of objects to serialize
+    :param role: name of a role to use when serializing
+    :param deferred_role: an instance of role used to dynamically a new role.
+    :param encode: yield the JSON of each chunk rather than a list of the
+        serialized objects.
+    :raises: :class:`MapperError`
+    :returns: generator of lists or str
+    """
+
+    pool = mapper_iterator.get_pool()
+
+    mapper = mapper_iterator.mapper
+    mapper_params = dict((k, v) for k, v in mapper_iterator.mapper_params.items()
+                         if k not in ('obj', 'data'))
+
+    tasks = ((mapper.__module__, mapper.__name__, mapper_params, chunk, role,
+              deferred_role, encode)
+             for chunk in iter_chunks(objs, mapper_iterator.chunk_size))
+
+    # Pool.imap and Executor.map consume every task up front, so chunks are
+    # submitted one at a time keeping at most max_pending in flight.
+    max_pending = CHUNKS_PER_WORKER * (mapper_iterator.workers or cpu_count())
+    pending = deque()
+    for task in tasks:
+        pending.append(_submit(pool, task))
+        if len(pending) < max_pending:
+            continue
+
+        chunk = pending.popleft()()
+        if chunk:
+            yield chunk
+
+    while pending:
+        chunk = pending.popleft()()
+        if chunk:
+            yield chunk
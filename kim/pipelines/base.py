@@ -5,11 +5,29 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
+import inspect
+
 from itertools import chain
 from functools import wraps
 
-from kim.exception import StopPipelineExecution, FieldError
-from kim.utils import attr_or_key, set_attr_or_key, attr_or_key_update, _remove_escapes
+from kim import profiling
+from kim.exception import (
+    StopPipelineExecution, FieldError, MapperError, PendingError)
+from kim.utils import attr_or_key_update
+
+
+class _Invalid(object):
+
+    __slots__ = ()
+
+    def __repr__(self):
+
+        return 'INVALID'
+
+
+#: Returned by a pipe after recording an error using :meth:`Session.invalid`
+#: to end the pipeline without raising an exception.
+INVALID = _Invalid()
 
 
 class Session(object):
@@ -44,10 +62,12 @@ class Session(object):
     serialization pipeline.
     """
 
-    __slots__ = ('field', 'data', 'output', 'parent', 'mapper_session', 'nested_mapper')
+    __slots__ = ('field', 'data', 'output', 'parent', 'mapper_session', 'nested_mapper',
+                 'resolved', 'bound_mapper', 'collect_errors', 'error')
 
     def __init__(self, field=None, data=None, output=None,
-                 parent=None, mapper_session=None, nested_mapper=None):
+                 parent=None, mapper_session=None, nested_mapper=None,
+                 resolved=None, bound_mapper=None, collect_errors=False):
         """Construct a new session.
 
         :param field: an instance of :class:`kim.field.Field` the scope of this session
@@ -60,6 +80,13 @@ class Session(object):
             referrence to the instance of the field wrapping field.
         :param mapper_session: The overal mapper marshaling or serialization session
             this field session belongs to.
+        :param nested_mapper: The mapper class used by a wrapped Nested field.
+        :param resolved: The result of a Nested getter already called for the
+            item currently being marshaled by a wrapped field.
+        :param bound_mapper: An instance of ``nested_mapper`` rebound to each
+            item serialized by a wrapped field.
+        :param collect_errors: Record errors passed to :meth:`invalid` in
+            ``error`` rather than raising :class:`kim.exception.FieldInvalid`.
         """
         self.field = field
         self.data = data
@@ -67,6 +94,68 @@ class Session(object):
         self.parent = parent
         self.mapper_session = mapper_session
         self.nested_mapper = nested_mapper
+        self.resolved = resolved
+        self.bound_mapper = bound_mapper
+        self.collect_errors = collect_errors
+        self.error = None
+
+    def reset(self, field, data, output, parent=None, mapper_session=None):
+        """Reset this session so it can be reused to run the pipeline of
+        another field rather than allocating a new session.
+
+        A session must only be reset once the pipeline it was used for has
+        finished.  Sessions are never shared between mapper calls so nested
+        mappers and collections reset their own sessions.  ``collect_errors``
+        is kept.
+
+        :param field: an instance of :class:`kim.field.Field` the scope of this session
+            is bound too.
+        :param data: data that has been passed along the pipeline field marshaling or
+            serialization session.
+        :param output: An object that contains the output of this fields marshaling
+            or serialization session.
+        :param parent:  If this is a wrapped field, then the parent kwarg will be a
+            referrence to the instance of the field wrapping field.
+        :param mapper_session: The overal mapper marshaling or serialization session
+            this field session belongs to.
+        :returns: this session
+        """
+        self.field = field
+        self.data = data
+        self.output = output
+        self.parent = parent
+        self.mapper_session = mapper_session
+        self.nested_mapper = None
+        self.resolved = None
+        self.bound_mapper = None
+        self.error = None
+        return self
+
+    def invalid(self, error_type):
+        """Mark the field being processed as invalid.  Pipes should return
+        the result, ending the pipeline::
+
+            @pipe()
+            def is_positive(session):
+                if session.data < 0:
+                    return session.invalid('negative')
+                return session.data
+
+        Sessions created by :meth:`kim.mapper.Mapper.marshal` collect errors,
+        the error is stored in ``error`` and its message is only formatted if
+        :attr:`kim.exception.MappingInvalid.errors` is read.  Otherwise
+        :class:`kim.exception.FieldInvalid` is raised.
+
+        :param error_type: The key of the error in the fields error messages.
+        :raises: :class:`kim.exception.FieldInvalid`
+        :returns: :data:`INVALID`
+        """
+
+        if not self.collect_errors:
+            self.field.invalid(error_type)
+
+        self.error = PendingError(self.field, error_type)
+        return INVALID
 
     @property
     def mapper(self):
@@ -78,12 +167,36 @@ class Session(object):
         return self.mapper_session.mapper
 
 
+def is_async_func(func):
+    """Return True if ``func`` was defined using ``async def`` or decorated using
+    :func:`pipe` with ``is_async=True``.
+
+    :param func: pipe or getter function
+    :rtype: bool
+    """
+
+    if getattr(func, 'is_async', False):
+        return True
+
+    iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+    return iscoroutinefunction is not None and iscoroutinefunction(func)
+
+
 def pipe(**pipe_kwargs):
     """Pipe decorator is provided as a convenience to avoid duplicating logic like
     not running pipes when session.data is null.
 
     :param run_if_none: Specify wether the pipe function should be called if session.data
         is None.
+    :param is_async: Specify that the pipe function returns an awaitable.  Pipes
+        defined with ``async def`` are detected automatically.  Async pipes are
+        awaited by :meth:`kim.mapper.Mapper.marshal_async` and
+        :meth:`kim.mapper.Mapper.serialize_async`, other pipelines raise
+        :class:`kim.exception.MapperError` when they contain one.
+
+    The decorated pipe exposes ``run_if_none`` and the undecorated ``pipe_func``
+    as attributes.  :func:`get_pipe_steps` uses them to call ``pipe_func``
+    directly, checking ``session.data`` itself.
 
     Usage::
 
@@ -100,18 +213,60 @@ def pipe(**pipe_kwargs):
         @wraps(pipe_func)
         def inner(session, *args, **kwargs):
 
-            if session.data is not None:
-                return pipe_func(session)
-            elif session.data is None and pipe_kwargs.get('run_if_none'):
-                return pipe_func(session)
-            else:
+            if session.data is None and not pipe_kwargs.get('run_if_none'):
                 return session.data
+            elif session.collect_errors:
+                # run_pipeline calls pipe_func directly, so this pipe was
+                # called by another pipe which expects FieldInvalid to be
+                # raised rather than INVALID to be returned.
+                session.collect_errors = False
+                try:
+                    return pipe_func(session)
+                finally:
+                    session.collect_errors = True
+            else:
+                return pipe_func(session)
 
+        inner.is_async = pipe_kwargs.get('is_async', is_async_func(pipe_func))
+        inner.run_if_none = bool(pipe_kwargs.get('run_if_none'))
+        inner.pipe_func = pipe_func
         return inner
 
     return pipe_decorator
 
 
+# Every pipe decorated by :func:`pipe` shares the code of ``inner``.  Other
+# decorators copying the attributes of a pipe using functools.wraps don't.
+_PIPE_CODE = pipe()(lambda session: None).__code__
+
+
+def get_pipe_steps(pipeline):
+    """Return the function to call for each pipe in ``pipeline`` along with
+    whether it should be called when ``session.data`` is None.
+
+    Pipes decorated by :func:`pipe` are replaced by the function they wrap,
+    removing a call per pipe.  Other callables are always called.
+
+    :param pipeline: list of pipe functions
+    :raises: :class:`kim.exception.MapperError` if ``pipeline`` contains an async
+        pipe, which can only be run by ``marshal_async`` and ``serialize_async``.
+    :returns: tuple of (function, run_if_none) tuples
+    """
+
+    steps = []
+    for pipe_func in pipeline:
+        if is_async_func(pipe_func):
+            raise MapperError(
+                'async pipe %s can only be run by marshal_async() or '
+                'serialize_async()' % getattr(pipe_func, '__name__', pipe_func))
+        elif getattr(pipe_func, '__code__', None) is _PIPE_CODE:
+            steps.append((pipe_func.pipe_func, pipe_func.run_if_none))
+        else:
+            steps.append((pipe_func, True))
+
+    return tuple(steps)
+
+
 class Pipeline(object):
     """Pipelines provide a simple, extensible way of processing data for
     a :class:`kim.field.Field`.  Each pipeline provides 4 input groups,
@@ -158,22 +313,47 @@ class Pipeline(object):
 
         return chain
 
+    @classmethod
+    def get_validation_pipeline(cls, **extra_pipes):
+        """Return the input and validation pipes of this pipeline, used to
+        check data without processing it or updating any output.
+
+        .. seealso::
+            :meth:`kim.mapper.Mapper.validate_data`
+        """
 
-def run_pipeline(pipeline, session, field, **opts):
+        chain = []
+        chain.extend(cls.input_pipes + extra_pipes.get('input', []))
+        chain.extend(cls.validation_pipes + extra_pipes.get('validation', []))
+
+        return chain
+
+
+def run_pipeline(pipeline, session, field, steps=None, **opts):
     """ Iterate over all of the defined ``pipes`` for this pipeline.
 
+    :param steps: the result of :func:`get_pipe_steps` for ``pipeline``,
+        computed from ``pipeline`` if not provided.
     :param parent_session: The field being processed by this Pipeline is wrapped,
         parent_session will be passed and set on the fields session.
     :returns: Returns the output of the pipelines session.
     :rtype: mixed
     """
 
+    if profiling.active is not None:
+        return profiling.active.run_pipeline(pipeline, session, field)
+
+    if steps is None:
+        steps = get_pipe_steps(pipeline)
+
     # chain all the pipelines pipes together and process them until the all the
-    # pipe groups have been exhausted or until
+    # pipe groups have been exhausted, until a pipe records an error or until
     # :class:`kim.exception.StopPipelineExecution` is raised.
     try:
-        for pipe_func in pipeline:
-            pipe_func(session)
+        for pipe_func, run_if_none in steps:
+            if (run_if_none or session.data is not None) and \
+                    (pipe_func(session) is INVALID or session.error is not None):
+                break
 
         return session.output
 
@@ -198,16 +378,16 @@ def get_data_from_name(session):
     if session.field.opts._is_wrapped:
         return session.data
 
-    value = attr_or_key(session.data, session.field.name)
+    value = session.field.opts.name_getter(session.data)
 
     if value is None:
         if session.field.opts.required and session.field.opts.default is None:
-            raise session.field.invalid(error_type='required')
+            return session.invalid('required')
         elif session.field.opts.default is not None:
             session.data = session.field.opts.default
             return session.data
         elif not session.field.opts.allow_none:
-            raise session.field.invalid(error_type='none_not_allowed')
+            return session.invalid('none_not_allowed')
 
     session.data = value
     return session.data
@@ -225,14 +405,14 @@ def get_data_from_source(session):
 
     """
 
-    source = session.field.opts.source
+    opts = session.field.opts
 
     # If the field is wrapped by another field then the relevant data
     # will have already been pulled from the source.
-    if session.field.opts._is_wrapped or source == '__self__':
+    if opts._is_wrapped or opts.source == '__self__':
         return session.data
 
-    value = attr_or_key(session.data, source)
+    value = opts.source_getter(session.data)
     session.data = value
     return session.data
 
@@ -272,7 +452,7 @@ def is_valid_choice(session):
 
     choices = session.field.opts.choices
     if choices is not None and session.data not in choices:
-        raise session.field.invalid('invalid_choice')
+        return session.invalid('invalid_choice')
 
     return session.data
 
@@ -286,7 +466,7 @@ def update_output_to_name(session):
 
     :returns: None
     """
-    session.output[_remove_escapes(session.field.name)] = session.data
+    session.output[session.field.opts.output_name] = session.data
 
 
 @pipe(run_if_none=True)
@@ -300,12 +480,12 @@ def update_output_to_source(session):
     :returns: None
     """
 
-    source = _remove_escapes(session.field.opts.source)
+    opts = session.field.opts
     try:
-        if source == '__self__':
+        if opts.source_path == ('__self__', ):
             attr_or_key_update(session.output, session.data)
         else:
-            set_attr_or_key(session.output, session.field.opts.source, session.data)
+            opts.source_setter(session.output, session.data)
     except (TypeError, AttributeError):
         raise FieldError('output does not support attribute or '
                          'key based set operations')
@@ -5,11 +5,14 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
+import sys
+
 from kim.exception import FieldInvalid
 from kim.utils import attr_or_key
 
-from .base import pipe
+from .base import pipe, get_pipe_steps, run_pipeline, Session, INVALID
 from .marshaling import MarshalPipeline
+from .nested import marshal_nested, check_sync_getter, call_sync_getter
 from .serialization import SerializePipeline
 
 
@@ -23,34 +26,208 @@ def marshall_collection(session):
     TODO(mike) this should be called marshal_collection
     """
     wrapped_field = session.field.opts.field
-    existing_value = attr_or_key(session.output, session.field.opts.source)
 
     output = []
 
     if session.data is not None:
-        if not hasattr(session.data, '__iter__'):
-            raise session.field.invalid('type_error')
-
-        for i, datum in enumerate(session.data):
-            _output = {}
-            # If the object already exists, try to match up the existing elements
-            # with those in the input json
-            if existing_value is not None:
-                try:
-                    _output[wrapped_field.opts.source] = existing_value[i]
-                except IndexError:
-                    pass
-
-            mapper_session = session.mapper.get_mapper_session(datum, _output)
-            wrapped_field.marshal(mapper_session, parent_session=session)
+        items = get_collection_items(session)
+        resolved = _resolve_getters(session, items)
+        if resolved is INVALID:
+            return INVALID
+
+        item_session = Session(collect_errors=session.collect_errors)
+
+        for i, (_output, mapper_session) in enumerate(items):
+            if resolved is not None:
+                session.resolved = resolved[i]
+            item_session.error = None
+            wrapped_field.marshal(mapper_session, parent_session=session,
+                                  session=item_session)
+
+            if item_session.error is not None:
+                session.resolved = None
+                session.error = item_session.error
+                return INVALID
 
             result = _output[wrapped_field.opts.source]
             output.append(result)
 
+        session.resolved = None
+
     session.data = output
     return session.data
 
 
+@pipe()
+def validate_collection(session):
+    """Validate each item in ``data`` using the input and validation stages of
+    the wrapped field defined for this collection.  Getters aren't called and
+    no output is built.
+
+    :param session: Kim pipeline session instance
+    """
+
+    wrapped_field = session.field.opts.field
+    item_session = Session(collect_errors=session.collect_errors)
+
+    for _output, mapper_session in get_collection_items(session):
+        item_session.error = None
+        wrapped_field.validate_data(mapper_session, parent_session=session,
+                                    session=item_session)
+
+        if item_session.error is not None:
+            session.error = item_session.error
+            return INVALID
+
+    return session.data
+
+
+def get_collection_items(session):
+    """Return the output and the mapper session used to marshal each item in
+    ``session.data`` through the wrapped field of the collection.
+
+    :param session: Kim pipeline session instance
+    :raises: FieldInvalid
+    :returns: list of (output, mapper_session) tuples
+    """
+
+    if not hasattr(session.data, '__iter__'):
+        raise session.field.invalid('type_error')
+
+    wrapped_field = session.field.opts.field
+    existing_value = session.field.opts.source_getter(session.output)
+
+    items = []
+    for i, datum in enumerate(session.data):
+        _output = {}
+        # If the object already exists, try to match up the existing elements
+        # with those in the input json
+        if existing_value is not None:
+            try:
+                _output[wrapped_field.opts.source] = existing_value[i]
+            except IndexError:
+                pass
+
+        items.append((_output, session.mapper.get_mapper_session(
+            datum, _output, fail_fast=session.mapper_session.fail_fast)))
+
+    return items
+
+
+def _call_getter(args):
+    """Call a Nested getter catching any exception so it can be raised when the
+    item is marshaled.
+    """
+
+    getter, getter_session = args
+    try:
+        return call_sync_getter(getter, getter_session), None
+    except Exception:
+        return None, sys.exc_info()
+
+
+def _resolve_getters(session, items):
+    """Resolve the objects of the Nested field wrapped by a collection for every
+    item up front.  A ``batch_getter`` is called once for all of the items,
+    otherwise the ``getter`` is called for each item concurrently using the
+    ``getter_pool`` of the collection.  Getters are only called once every
+    item has passed :func:`check_items`.
+
+    :param session: Kim pipeline session instance
+    :param items: list of the output and mapper session of each item
+    :raises: :class:`kim.exception.MapperError` if the getter is async
+    :returns: list of (result, exc_info) tuples in the order of ``items``,
+        :data:`INVALID` if an item is invalid or None if the getters should
+        be called as each item is marshaled.
+    """
+
+    opts = session.field.opts
+    getter = getattr(opts.field.opts, 'getter', None)
+    batch_getter = getattr(opts.field.opts, 'batch_getter', None)
+
+    if batch_getter is None and (opts.getter_pool is None or getter is None):
+        return None
+    elif marshal_nested not in opts.field.marshal_pipes:
+        return None
+
+    check_sync_getter(batch_getter or getter)
+    if not check_items(session, items):
+        return INVALID
+
+    sessions = get_getter_sessions(session, items)
+
+    if batch_getter is not None:
+        resolved = call_sync_getter(batch_getter, sessions) if sessions else {}
+        results = [(resolved.get(i), None) for i in range(len(sessions))]
+    else:
+        results = opts.get_getter_pool().map(
+            _call_getter, [(getter, s) for s in sessions])
+
+    return match_getter_results(items, results)
+
+
+def check_items(session, items):
+    """Run the marshal pipes of the Nested field wrapped by a collection that
+    come before :func:`kim.pipelines.nested.marshal_nested` for every item,
+    so getters called up front only see items that would reach their getter.
+    The pipes are run again as each item is marshaled.
+
+    :param session: Kim pipeline session instance
+    :param items: list of the output and mapper session of each item
+    :raises: :class:`kim.exception.FieldInvalid`
+    :returns: False if an item is invalid, storing its error in
+        ``session.error``
+    """
+
+    wrapped_field = session.field.opts.field
+    pipes = wrapped_field.marshal_pipes
+    pipes = pipes[:pipes.index(marshal_nested)]
+    steps = get_pipe_steps(pipes)
+    item_session = Session(collect_errors=session.collect_errors)
+
+    for _output, mapper_session in items:
+        item_session.reset(wrapped_field, mapper_session.data, dict(_output),
+                           parent=session, mapper_session=mapper_session)
+        run_pipeline(pipes, item_session, wrapped_field, steps=steps)
+
+        if item_session.error is not None:
+            session.error = item_session.error
+            return False
+
+    return True
+
+
+def get_getter_sessions(session, items):
+    """Return the sessions passed to the getter of the Nested field wrapped by a
+    collection for each item that isn't null.  Getters aren't called for null
+    items, they never reach marshal_nested.
+
+    :param session: Kim pipeline session instance
+    :param items: list of the output and mapper session of each item
+    :returns: list of :class:`Session`
+    """
+
+    wrapped_field = session.field.opts.field
+    return [Session(wrapped_field, mapper_session.data, _output,
+                    parent=session, mapper_session=mapper_session)
+            for _output, mapper_session in items
+            if mapper_session.data is not None]
+
+
+def match_getter_results(items, results):
+    """Match the results of the getter called for the sessions returned by
+    :func:`get_getter_sessions` back up with ``items``.
+
+    :param items: list of the output and mapper session of each item
+    :param results: iterable of (result, exc_info) tuples
+    :returns: list of (result, exc_info) tuples or None for null items
+    """
+
+    results = iter(results)
+    return [next(results) if mapper_session.data is not None else None
+            for _output, mapper_session in items]
+
+
 @pipe()
 def serialize_collection(session):
     """iterate over each item in ``data`` and serialize the item through the
@@ -72,10 +249,12 @@ def serialize_collection(session):
         'get_mapper',
         lambda **kwargs: None)(as_class=True)
 
+    item_session = Session()
     for datum in session.data:
         mapper_session.data = datum
         mapper_session.output = {}
-        wrapped_field.serialize(mapper_session, parent_session=session)
+        wrapped_field.serialize(mapper_session, parent_session=session,
+                                session=item_session)
         output.append(mapper_session.output[field_name])
 
     session.data = output
@@ -95,7 +274,7 @@ def check_duplicates(session):
     if key:
         keys = [attr_or_key(a, key) for a in data]
         if len(keys) != len(set(keys)):
-            raise session.field.invalid(error_type='duplicates')
+            return session.invalid('duplicates')
     return data
 
 
@@ -105,11 +284,23 @@ class CollectionMarshalPipeline(MarshalPipeline):
     .. seealso::
         :func:`kim.pipelines.collection.check_duplicates`
         :func:`kim.pipelines.collection.marshal_collection`
+        :func:`kim.pipelines.collection.validate_collection`
         :class:`kim.pipelines.marshaling.MarshalPipeline`
     """
 
     input_pipes = MarshalPipeline.input_pipes + [check_duplicates, marshall_collection]
 
+    @classmethod
+    def get_validation_pipeline(cls, **extra_pipes):
+        """Validate the items of the collection using
+        :func:`validate_collection` rather than marshaling them.
+        """
+
+        pipeline = super(CollectionMarshalPipeline, cls).get_validation_pipeline(
+            **extra_pipes)
+        return [validate_collection if pipe_func is marshall_collection
+                else pipe_func for pipe_func in pipeline]
+
 
 class CollectionSerializePipeline(SerializePipeline):
     """CollectionSerializePipeline
@@ -19,7 +19,7 @@ def parse_iso8601(session):
     try:
         session.data = iso8601.parse_date(session.data)
     except iso8601.ParseError:
-        raise session.field.invalid(error_type='invalid')
+        return session.invalid('invalid')
 
     return session.data
 
@@ -30,7 +30,7 @@ def parse_date_str(session):
     try:
         session.data = dt.strptime(session.data, date_format)
     except ValueError:
-        raise session.field.invalid(error_type='invalid')
+        return session.invalid('invalid')
 
     return session.data
 
@@ -5,18 +5,74 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
-from kim.utils import attr_or_key
+import inspect
 
-from .base import pipe
+import six
+
+from kim.exception import MappingInvalid, MapperError
+
+from .base import pipe, is_async_func
 from .marshaling import MarshalPipeline
 from .serialization import SerializePipeline
 
 
+_isawaitable = getattr(inspect, 'isawaitable', lambda value: False)
+
+
+def _async_getter_error(getter):
+
+    return MapperError(
+        'async getter %s can only be run by marshal_async()'
+        % getattr(getter, '__name__', getter))
+
+
+def check_sync_getter(getter):
+    """Check the ``getter`` or ``batch_getter`` of a Nested field can be called
+    by :meth:`kim.mapper.Mapper.marshal`, which can't await its result.
+
+    :param getter: getter or batch_getter function
+    :raises: :class:`kim.exception.MapperError` if ``getter`` is async
+    """
+
+    if is_async_func(getter):
+        raise _async_getter_error(getter)
+
+
+def call_sync_getter(getter, arg):
+    """Call the ``getter`` or ``batch_getter`` of a Nested field marshaled by
+    :meth:`kim.mapper.Mapper.marshal`.
+
+    :param getter: getter or batch_getter function
+    :param arg: the session or list of sessions passed to ``getter``
+    :raises: :class:`kim.exception.MapperError` if ``getter`` is async or
+        returns an awaitable, which only ``marshal_async`` supports.
+    :returns: the result of ``getter``
+    """
+
+    check_sync_getter(getter)
+    result = getter(arg)
+    if _isawaitable(result):
+        # Close coroutines so they don't warn about never being awaited.
+        getattr(result, 'close', lambda: None)()
+        raise _async_getter_error(getter)
+
+    return result
+
+
 def _call_getter(session):
-    if session.field.opts.getter:
-        result = session.field.opts.getter(session)
+    # Getters for the items of a collection may have been called up front, see
+    # kim.pipelines.collection.marshall_collection
+    if session.parent is not None and session.parent.resolved is not None:
+        result, exc_info = session.parent.resolved
+        if exc_info is not None:
+            six.reraise(*exc_info)
         return result
 
+    if session.field.opts.getter:
+        return call_sync_getter(session.field.opts.getter, session)
+    elif session.field.opts.batch_getter:
+        return call_sync_getter(session.field.opts.batch_getter, [session]).get(0)
+
 
 @pipe()
 def marshal_nested(session):
@@ -44,6 +100,70 @@ def marshal_nested(session):
     """
 
     resolved = _call_getter(session)
+    nested_mapper = get_nested_mapper(session, resolved)
+
+    if nested_mapper is None:
+        session.data = resolved
+    else:
+        session.data = nested_mapper.marshal(
+            role=session.field.opts.role,
+            fail_fast=session.mapper_session.fail_fast)
+
+    return session.data
+
+
+@pipe()
+def validate_nested(session):
+    """Validate data using the nested mapper defined on this field without
+    calling the getter or creating the nested object.
+
+    The rules of :func:`marshal_nested` decide whether the nested data is
+    validated.  Without a getter the data is invalid unless it would update an
+    existing object or ``allow_create`` is set.  As the getter isn't called,
+    fields with a ``getter`` or ``batch_getter`` validate the nested data when
+    it may be used to update or create an object, ``allow_updates`` or
+    ``allow_create``, and otherwise leave it to the getter.
+
+    :param session: Kim pipeline session instance
+    :raises: MappingInvalid
+    """
+
+    opts = session.field.opts
+    if opts.getter or opts.batch_getter:
+        if not (opts.allow_updates or opts.allow_create):
+            return session.data
+    elif not ((opts.allow_updates_in_place or opts.allow_partial_updates) and
+              opts.name_getter(session.output) is not None) and \
+            not opts.allow_create:
+        return session.invalid('not_found')
+
+    if session.parent and session.parent.nested_mapper:
+        nested_mapper_class = session.parent.nested_mapper
+    else:
+        nested_mapper_class = session.field.get_mapper(as_class=True)
+
+    mapper_session = session.mapper_session
+    nested_mapper = nested_mapper_class(
+        data=session.data, partial=mapper_session.partial,
+        parent=session.mapper)
+    errors = nested_mapper.validate_data(role=session.field.opts.role,
+                                         fail_fast=mapper_session.fail_fast)
+    if errors:
+        raise MappingInvalid(errors)
+
+    return session.data
+
+
+def get_nested_mapper(session, resolved):
+    """Return the nested mapper used to marshal ``session.data`` given the object
+    returned by the getter of the field, or None if ``resolved`` should be set
+    as is.
+
+    :param session: Kim pipeline session instance
+    :param resolved: the object returned by the getter or None
+    :raises: FieldInvalid
+    :returns: :class:`kim.mapper.Mapper` instance or None
+    """
 
     partial = session.mapper_session.partial
     parent_mapper = session.mapper
@@ -55,30 +175,25 @@ def marshal_nested(session):
 
     if resolved is not None:
         if session.field.opts.allow_updates:
-            nested_mapper = nested_mapper_class(
+            return nested_mapper_class(
                 data=session.data, obj=resolved, partial=partial,
                 parent=parent_mapper)
-            session.data = nested_mapper.marshal(role=session.field.opts.role)
         else:
-            session.data = resolved
+            return None
     else:
-        existing_value = attr_or_key(session.output, session.field.name)
+        existing_value = session.field.opts.name_getter(session.output)
         if (session.field.opts.allow_updates_in_place or
                 session.field.opts.allow_partial_updates) and \
                 existing_value is not None:
-            nested_mapper = nested_mapper_class(
+            return nested_mapper_class(
                 data=session.data, obj=existing_value, partial=partial,
                 parent=parent_mapper)
-            session.data = nested_mapper.marshal(role=session.field.opts.role)
         elif session.field.opts.allow_create:
-            nested_mapper = nested_mapper_class(
+            return nested_mapper_class(
                 data=session.data, partial=partial, parent=parent_mapper)
-            session.data = nested_mapper.marshal(role=session.field.opts.role)
         else:
             raise session.field.invalid(error_type='not_found')
 
-    return session.data
-
 
 @pipe(run_if_none=True)
 def serialize_nested(session):
@@ -92,8 +207,16 @@ def serialize_nested(session):
         return session.data
 
     # Grab the Mapper defined for the nested field and call serialize()
-    if session.parent and session.parent.nested_mapper:
-        nested_mapper = session.parent.nested_mapper(obj=session.data)
+    parent = session.parent
+    if parent and parent.nested_mapper:
+        # A wrapped field reuses one mapper for every item of the collection.
+        nested_mapper = parent.bound_mapper
+        if nested_mapper is not None:
+            nested_mapper.bind(obj=session.data)
+        else:
+            nested_mapper = parent.nested_mapper(obj=session.data)
+            if parent.nested_mapper._is_rebindable():
+                parent.bound_mapper = nested_mapper
     else:
         nested_mapper = session.field.get_mapper(obj=session.data)
 
@@ -107,11 +230,22 @@ class NestedMarshalPipeline(MarshalPipeline):
 
     .. seealso::
         :func:`kim.pipelines.nested.marshal_nested`
+        :func:`kim.pipelines.nested.validate_nested`
         :class:`kim.pipelines.marshaling.MarshalPipeline`
     """
 
     output_pipes = [marshal_nested, ] + MarshalPipeline.output_pipes
 
+    @classmethod
+    def get_validation_pipeline(cls, **extra_pipes):
+        """Validate the nested data using :func:`validate_nested` once the
+        input and validation pipes have run.
+        """
+
+        pipeline = super(NestedMarshalPipeline, cls).get_validation_pipeline(
+            **extra_pipes)
+        return pipeline + [validate_nested]
+
 
 class NestedSerializePipeline(SerializePipeline):
     """NestedSerializePipeline
@@ -23,9 +23,9 @@ def is_valid_integer(session):
     try:
         session.data = int(session.data)
     except TypeError:
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid('type_error')
     except ValueError:
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid('type_error')
     return session.data
 
 
@@ -42,9 +42,9 @@ def bounds_check(session):
     min_ = session.field.opts.min
 
     if max_ is not None and session.data > max_:
-        raise session.field.invalid(error_type='out_of_bounds')
+        return session.invalid('out_of_bounds')
     if min_ is not None and session.data < min_:
-        raise session.field.invalid(error_type='out_of_bounds')
+        return session.invalid('out_of_bounds')
 
     return session.data
 
@@ -82,7 +82,7 @@ def is_valid_decimal(session):
     try:
         return Decimal(session.data)
     except InvalidOperation:
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid('type_error')
 
 
 @pipe()
@@ -139,7 +139,7 @@ def is_valid_float(session):
     try:
         return float(session.data)
     except (InvalidOperation, ValueError):
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid('type_error')
 
 
 
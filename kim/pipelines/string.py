@@ -25,9 +25,9 @@ def bounds_check(session):
     min_ = session.field.opts.min
 
     if max_ is not None and len(session.data) > max_:
-        raise session.field.invalid(error_type='out_of_bounds')
+        return session.invalid('out_of_bounds')
     if min_ is not None and len(session.data) < min_:
-        raise session.field.invalid(error_type='out_of_bounds')
+        return session.invalid('out_of_bounds')
 
     return session.data
 
@@ -43,7 +43,7 @@ def is_valid_string(session):
         session.data = six.text_type(session.data)
         return session.data
     except ValueError:
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid('type_error')
 
 
 @pipe()
@@ -55,7 +55,7 @@ def blank_check(session):
     """
 
     if session.data == '' and session.field.opts.blank is False:
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid('type_error')
 
     return session.data
 
@@ -0,0 +1,233 @@
+# kim/profiling.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+import math
+import threading
+
+from collections import namedtuple
+from timeit import default_timer
+
+from .exception import StopPipelineExecution
+
+
+#: The profiler pipelines are currently reporting to.  Set using :func:`enable`.
+active = None
+
+
+def enable(profiler=None):
+    """Start recording the time spent in each pipe.
+
+    :param profiler: :class:`PipeProfiler` to record to, a new one is created
+        if not provided.
+    :returns: the active :class:`PipeProfiler`
+    """
+
+    global active
+    active = profiler or PipeProfiler()
+    return active
+
+
+def disable():
+    """Stop recording the time spent in each pipe.
+
+    :returns: the :class:`PipeProfiler` that was active or None
+    """
+
+    global active
+    profiler, active = active, None
+    return profiler
+
+
+#: A row of :meth:`PipeProfiler.stats`.  Times are in seconds, percentiles are
+#: the upper bound of the histogram bucket the percentile falls in.
+PipeStats = namedtuple('PipeStats', [
+    'mapper', 'field', 'pipe', 'calls', 'total', 'mean', 'p50', 'p95', 'p99',
+    'max'])
+
+
+class Histogram(object):
+    """Counts durations in buckets doubling in size from 1 microsecond."""
+
+    __slots__ = ('calls', 'total', 'max', 'buckets')
+
+    def __init__(self):
+
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, elapsed):
+
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+        bucket = max(math.frexp(elapsed * 1e6)[1], 0)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent):
+        """Return the upper bound of the bucket containing ``percent`` of calls.
+
+        :param percent: percentile between 0 and 100
+        :rtype: float
+        """
+
+        target = self.calls * percent / 100.0
+        count = 0
+        for bucket in sorted(self.buckets):
+            count += self.buckets[bucket]
+            if count >= target:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+
+class PipeProfiler(object):
+    """Records the number of calls and the time spent in each pipe run by
+    :func:`kim.pipelines.base.run_pipeline`, grouped by mapper, field and pipe.
+
+    Times are inclusive, the time spent in a pipe serializing a Nested field
+    includes the time spent in the pipes of the nested mapper.  Fields inlined by
+    compiled mappers don't run their pipeline and aren't recorded.
+
+    Usage::
+
+        from kim import profiling
+
+        with profiling.PipeProfiler() as profiler:
+            UserMapper.many().serialize(users)
+
+        print(profiler.report())
+    """
+
+    def __init__(self, mappers=None):
+        """Construct a new PipeProfiler.
+
+        :param mappers: only record pipes run by these :class:`kim.mapper.Mapper`
+            classes.  All mappers are recorded by default.
+        """
+
+        self.mappers = frozenset(mappers) if mappers is not None else None
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+
+        return enable(self)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        disable()
+
+    def reset(self):
+        """Remove all recorded timings.
+
+        :returns: None
+        """
+
+        with self._lock:
+            self.histograms = {}
+
+    def record(self, mapper, field, pipe_func, elapsed):
+        """Record a call to ``pipe_func`` taking ``elapsed`` seconds.
+
+        :param mapper: the :class:`kim.mapper.Mapper` running the pipeline
+        :param field: the :class:`kim.field.Field` the pipeline belongs to
+        :param pipe_func: the pipe function called
+        :param elapsed: time spent in the pipe in seconds
+        :returns: None
+        """
+
+        key = (type(mapper), field, pipe_func)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.add(elapsed)
+
+    def run_pipeline(self, pipeline, session, field):
+        """Run ``pipeline`` like :func:`kim.pipelines.base.run_pipeline`, timing
+        each pipe.
+
+        :returns: Returns the output of the pipelines session.
+        """
+
+        from .pipelines.base import INVALID
+
+        mapper = session.mapper_session.mapper
+        if self.mappers is not None and type(mapper) not in self.mappers:
+            try:
+                for pipe_func in pipeline:
+                    if pipe_func(session) is INVALID or \
+                            session.error is not None:
+                        break
+            except StopPipelineExecution:
+                pass
+            return session.output
+
+        try:
+            for pipe_func in pipeline:
+                start = default_timer()
+                try:
+                    result = pipe_func(session)
+                finally:
+                    self.record(mapper, field, pipe_func, default_timer() - start)
+                if result is INVALID or session.error is not None:
+                    break
+        except StopPipelineExecution:
+            pass
+
+        return session.output
+
+    def stats(self, sort_by='total'):
+        """Return the timings recorded for each pipe.
+
+        :param sort_by: name of the :class:`PipeStats` attribute to sort by,
+            largest first.
+        :returns: list of :class:`PipeStats`
+        """
+
+        with self._lock:
+            items = list(self.histograms.items())
+
+        stats = []
+        for (mapper_cls, field, pipe_func), histogram in items:
+            stats.append(PipeStats(
+                mapper=mapper_cls.__name__,
+                field=field.opts.output_name or type(field).__name__,
+                pipe=getattr(pipe_func, '__name__', repr(pipe_func)),
+                calls=histogram.calls,
+                total=histogram.total,
+                mean=histogram.total / histogram.calls,
+                p50=histogram.percentile(50),
+                p95=histogram.percentile(95),
+                p99=histogram.percentile(99),
+                max=histogram.max))
+
+        return sorted(stats, key=lambda s: getattr(s, sort_by), reverse=True)
+
+    def report(self, sort_by='total', limit=None):
+        """Format the timings recorded for each pipe as a table.  Times are shown
+        in milliseconds.
+
+        :param sort_by: name of the :class:`PipeStats` attribute to sort by.
+        :param limit: maximum number of rows to include.
+        :rtype: str
+        """
+
+        headers = list(PipeStats._fields)
+        rows = []
+        for stat in self.stats(sort_by=sort_by)[:limit]:
+            rows.append([stat.mapper, stat.field, stat.pipe, str(stat.calls)] +
+                        ['%.3f' % (t * 1000) for t in stat[4:]])
+
+        widths = [max([len(h)] + [len(r[i]) for r in rows])
+                  for i, h in enumerate(headers)]
+        lines = [headers, ['-' * w for w in widths]] + rows
+        return '\n'.join('  '.join(c.ljust(w) for c, w in zip(line, widths)).rstrip()
+                         for line in lines)
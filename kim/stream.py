@@ -0,0 +1,219 @@
+# kim/stream.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+import codecs
+import json
+import re
+
+from .compiler import get_serialize_kind
+from .exception import MapperError
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_CHARS = re.compile(r'[0-9.eE+-]*')
+
+
+def _get_value(mapper, field, obj):
+
+    opts = field.opts
+    if opts.source == '__self__':
+        return obj
+
+    getter = mapper._accessors.get(opts.source, (opts.source_getter, ))[0]
+    return getter(obj)
+
+
+def _apply_default(field, value):
+
+    if value is None:
+        return field.opts.default
+    return value
+
+
+def _write_nested(field, value, stream, encode):
+    """Write a value read for a Nested ``field`` to ``stream``, serializing the
+    nested object directly to the stream.
+    """
+
+    if value is None:
+        value = _apply_default(field, field.opts.null_default)
+        stream.write(encode(value))
+    else:
+        nested_mapper = field.get_mapper(obj=value)
+        write_mapper(nested_mapper, stream, encode, role=field.opts.role)
+
+
+def _write_collection(field, value, stream, encode):
+    """Write a value read for a Collection ``field`` to ``stream``, writing each
+    nested object in the collection directly to the stream.
+    """
+
+    if value is None:
+        stream.write(encode(field.opts.default))
+        return
+
+    wrapped = field.opts.field
+    stream.write('[')
+    for i, item in enumerate(value):
+        if i:
+            stream.write(', ')
+        _write_nested(wrapped, item, stream, encode)
+    stream.write(']')
+
+
+def _get_streamed_kind(field):
+    """Return the serialize kind of ``field`` if it's written to the stream
+    recursively, otherwise None.
+    """
+
+    kind = get_serialize_kind(field)
+    if kind == 'nested' or (kind == 'collection' and
+                            get_serialize_kind(field.opts.field) == 'nested'):
+        return kind
+
+
+def write_mapper(mapper, stream, encode, role='__default__',
+                 deferred_role=None):
+    """Write the JSON serialization of ``mapper.obj`` to ``stream``.
+
+    Each field is written as soon as it's serialized.  Nested fields and
+    Collections of Nested fields using the built-in pipelines write their
+    objects to the stream recursively instead of building them in memory.
+
+    :param mapper: :class:`kim.mapper.Mapper` instance
+    :param stream: file-like object accepting str via ``write()``
+    :param encode: function encoding a serialized value as a JSON str
+    :param role: the name of a role as a string or a :class:`Role` instance.
+    :param deferred_role: an instance of role used to dynamically a new role.
+    :returns: None
+    """
+
+    from .compiler import _unbound
+    from .mapper import Mapper
+
+    if mapper.raw or \
+            _unbound(type(mapper).serialize) is not _unbound(Mapper.serialize):
+        stream.write(encode(mapper.serialize(role=role,
+                                             deferred_role=deferred_role)))
+        return
+
+    obj = mapper.obj
+    fields = mapper._get_role_fields(role, deferred_role=deferred_role)[1]
+    separator = ''
+
+    stream.write('{')
+    for field in fields:
+        kind = _get_streamed_kind(field)
+
+        if kind is None:
+            output = {}
+            field.serialize(mapper.get_mapper_session(obj, output))
+            for key, value in output.items():
+                stream.write('%s%s: %s' % (separator, encode(key), encode(value)))
+                separator = ', '
+            continue
+
+        stream.write('%s%s: ' % (separator, encode(field.opts.output_name)))
+        separator = ', '
+
+        value = _get_value(mapper, field, obj)
+        if kind == 'nested':
+            _write_nested(field, value, stream, encode)
+        else:
+            _write_collection(field, value, stream, encode)
+
+    stream.write('}')
+
+
+def get_encoder(encoder=None):
+    """Return the function used to encode serialized values.
+
+    :param encoder: optional :class:`json.JSONEncoder` instance.
+    :returns: function accepting a value and returning a JSON str
+    """
+
+    return (encoder or json.JSONEncoder()).encode
+
+
+def _read(stream, decoder, chunk_size):
+
+    chunk = stream.read(chunk_size)
+    eof = not chunk
+    if isinstance(chunk, bytes):
+        chunk = decoder.decode(chunk, final=eof)
+    return chunk, eof
+
+
+def iter_json_array(stream, chunk_size=65536):
+    """Incrementally parse a JSON array read from ``stream``, yielding each
+    element as soon as it has been parsed.  Only the element being parsed is
+    held in memory.
+
+    :param stream: file-like object returning bytes or str from ``read()``.
+        bytes are decoded as utf-8.
+    :param chunk_size: number of bytes read from ``stream`` at a time.
+    :raises: :class:`MapperError` if the stream is not a valid JSON array
+    :returns: generator of the decoded elements of the array
+    """
+
+    raw_decode = json.JSONDecoder().raw_decode
+    decoder = codecs.getincrementaldecoder('utf-8')()
+
+    buf, pos, eof = u'', 0, False
+    # start, first (after '['), value (after ','), after (after a value), end
+    state = 'start'
+
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+
+        if pos == len(buf):
+            if eof:
+                if state == 'end':
+                    return
+                raise MapperError('Unexpected end of JSON array')
+
+            chunk, eof = _read(stream, decoder, chunk_size)
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        char = buf[pos]
+
+        if state == 'start':
+            if char != '[':
+                raise MapperError('Expected a JSON array')
+            state = 'first'
+            pos += 1
+        elif state == 'first' and char == ']':
+            state = 'end'
+            pos += 1
+        elif state in ('first', 'value'):
+            try:
+                value, end = raw_decode(buf, pos)
+            except ValueError:
+                value = end = None
+
+            # A number may be split across chunks, raw_decode accepts any
+            # prefix of it.  Read more until something other than a number
+            # character follows it.
+            incomplete = end is None or (
+                not eof and char in '-0123456789' and
+                NUMBER_CHARS.match(buf, end).end() == len(buf))
+            if incomplete:
+                if eof:
+                    raise MapperError('Invalid JSON array element')
+                chunk, eof = _read(stream, decoder, chunk_size)
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+
+            state = 'after'
+            pos = end
+            yield value
+        elif state == 'after' and char in ',]':
+            state = 'value' if char == ',' else 'end'
+            pos += 1
+        else:
+            raise MapperError('Unexpected %r in JSON array' % char)
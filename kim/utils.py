@@ -5,10 +5,12 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 import re
+import threading
 
 from datetime import datetime  # NOQA
+from functools import partial
 
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 
 
 _creation_order = 1
@@ -129,6 +131,81 @@ def set_attr_or_key(obj, name, value):
     _set_attr_or_key(obj, components[-1], value)
 
 
+def _get_attr(obj, name, getter=getattr):
+
+    return getter(obj, name, None)
+
+
+def _get_key(obj, name):
+
+    if obj is None:
+        return None
+    return obj.get(name)
+
+
+def _set_key(obj, name, value):
+
+    obj[name] = value
+
+
+#: Functions used to get and set a single attribute or key for each of the
+#: strategies a mapper may use to access the objects it works with.  ``auto``
+#: checks for a dict each time a value is accessed, ``attr`` and ``dict``
+#: always use attribute or key access.
+ACCESSORS = {
+    'auto': (_attr_or_key, _set_attr_or_key),
+    'attr': (_get_attr, setattr),
+    'dict': (_get_key, _set_key),
+}
+
+
+def get_attr_or_key_getter(path, accessor='auto'):
+    """Return a function reading the value stored at ``path`` from an object
+    or dict.  The returned function behaves like :func:`attr_or_key` but
+    ``path`` is only parsed once.
+
+    :param path: sequence of names as returned by :func:`_split_escape`
+    :param accessor: one of the keys of :data:`ACCESSORS`
+    :returns: function accepting the obj to read from
+    """
+
+    get = ACCESSORS[accessor][0]
+
+    if len(path) == 1:
+        return partial(get, name=path[0])
+
+    def getter(obj, path=tuple(path), get=get):
+        for component in path:
+            obj = get(obj, component)
+        return obj
+
+    return getter
+
+
+def get_attr_or_key_setter(path, accessor='auto'):
+    """Return a function setting a value at ``path`` on an object or dict.  The
+    returned function behaves like :func:`set_attr_or_key` but ``path`` is only
+    parsed once.
+
+    :param path: sequence of names as returned by :func:`_split_escape`
+    :param accessor: one of the keys of :data:`ACCESSORS`
+    :returns: function accepting the obj to set the value on and the value
+    """
+
+    name = path[-1]
+    set_ = ACCESSORS[accessor][1]
+
+    if len(path) == 1:
+        return lambda obj, value: set_(obj, name, value)
+
+    get = get_attr_or_key_getter(path[:-1], accessor)
+
+    def setter(obj, value):
+        set_(get(obj), name, value)
+
+    return setter
+
+
 def attr_or_key_update(obj, value):
     """If obj is a dict, add keys from value to it with update(),
     otherwise use setattr to set every attribute from value on obj
@@ -146,3 +223,44 @@ def recursive_defaultdict():
 
     """
     return defaultdict(recursive_defaultdict)
+
+
+class LRUCache(object):
+    """A mapping holding at most ``maxsize`` items, discarding the least
+    recently used item once it's full.  Safe to share between threads.
+    """
+
+    def __init__(self, maxsize):
+
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the item stored against ``key``, marking it as the most
+        recently used, or ``default`` if there isn't one.
+        """
+
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return default
+            self._items[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+
+        return key in self._items
+
+    def __len__(self):
+
+        return len(self._items)
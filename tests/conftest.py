@@ -1,3 +1,5 @@
+import sys
+
 import pytest
 
 from kim.mapper import _MapperConfig, Mapper
@@ -13,3 +15,8 @@ def get_mapper_session(data=None, obj=None, output=None):
 
     mapper = Mapper(data=data, obj=obj)
     return mapper.get_mapper_session(data or obj, output)
+
+
+# asyncio support requires the async/await syntax.
+if sys.version_info < (3, 5):
+    collect_ignore = ['test_aio.py']
@@ -0,0 +1,251 @@
+import asyncio
+
+import pytest
+
+from kim import Mapper, field, pipe
+from kim.exception import MapperError, MappingInvalid
+from kim.pipelines.base import is_async_func
+
+from .helpers import TestType
+
+
+def run(coro):
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_pipe_is_async():
+
+    @pipe()
+    async def async_pipe(session):
+        pass
+
+    @pipe(is_async=True)
+    def awaitable_pipe(session):
+        pass
+
+    @pipe()
+    def sync_pipe(session):
+        pass
+
+    assert is_async_func(async_pipe)
+    assert is_async_func(awaitable_pipe)
+    assert not is_async_func(sync_pipe)
+
+
+def get_mappers(getter):
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+        name = field.String()
+
+    @pipe()
+    async def upper(session):
+        await asyncio.sleep(0)
+        session.data = session.data.upper()
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        title = field.String(extra_marshal_pipes={'process': [upper]},
+                             extra_serialize_pipes={'process': [upper]})
+        author = field.Nested(UserMapper, getter=getter, allow_create=True)
+        readers = field.Collection(field.Nested(UserMapper, getter=getter))
+
+    return PostMapper
+
+
+def test_marshal_async():
+
+    users = dict((str(i), TestType(id=str(i), name='user %s' % i))
+                 for i in range(5))
+    pending = []
+    concurrent = []
+
+    async def getter(session):
+        pending.append(session.data['id'])
+        await asyncio.sleep(0.01)
+        concurrent.append(len(pending))
+        pending.remove(session.data['id'])
+        return users.get(session.data['id'])
+
+    PostMapper = get_mappers(getter)
+    data = {'title': 'post', 'author': {'id': 'new', 'name': 'bob'},
+            'readers': [{'id': '3'}, {'id': '1'}, {'id': '4'}]}
+
+    result = run(PostMapper(data=data).marshal_async())
+
+    assert result.title == 'POST'
+    assert (result.author.id, result.author.name) == ('new', 'bob')
+    assert result.readers == [users['3'], users['1'], users['4']]
+    assert max(concurrent) > 1
+
+
+def test_marshal_async_errors():
+
+    async def getter(session):
+        if session.data.get('id') == '2':
+            raise session.field.invalid('not_found')
+
+    PostMapper = get_mappers(getter)
+    data = {'title': 'post', 'author': {'name': 'bob'},
+            'readers': [{'id': '1'}, {'id': '2'}]}
+
+    with pytest.raises(MappingInvalid) as e:
+        run(PostMapper(data=data).marshal_async())
+
+    assert e.value.errors == {
+        'author': {'id': 'This is a required field'},
+        'readers': 'readers not found',
+    }
+
+
+def test_marshal_async_batch_getter():
+
+    users = {'1': TestType(id='1')}
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+
+    async def batch_getter(sessions):
+        return dict((i, users.get(s.data['id'])) for i, s in enumerate(sessions))
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        readers = field.Collection(
+            field.Nested(UserMapper, batch_getter=batch_getter))
+
+    result = run(PostMapper(data={'readers': [{'id': '1'}]}).marshal_async())
+
+    assert result.readers == [users['1']]
+
+
+def test_serialize_async():
+
+    PostMapper = get_mappers(None)
+    post = TestType(title='post', author=TestType(id='1', name='mike'),
+                    readers=[TestType(id='2', name='bob')])
+
+    result = run(PostMapper(obj=post).serialize_async())
+
+    assert result == {
+        'title': 'POST',
+        'author': {'id': '1', 'name': 'mike'},
+        'readers': [{'id': '2', 'name': 'bob'}],
+    }
+
+
+def test_sync_pipeline_rejects_async_pipes():
+
+    PostMapper = get_mappers(None)
+    post = TestType(title='post', author=TestType(id='1', name='mike'),
+                    readers=[])
+
+    with pytest.raises(MapperError):
+        PostMapper(obj=post).serialize()
+
+    with pytest.raises(MapperError):
+        PostMapper(data={'title': 'post'}).marshal()
+
+    @pipe(is_async=True)
+    def awaitable_pipe(session):
+        return asyncio.sleep(0)
+
+    class NameMapper(Mapper):
+
+        __type__ = TestType
+        __compile__ = True
+
+        name = field.String(extra_marshal_pipes={'process': [awaitable_pipe]})
+
+    with pytest.raises(MapperError):
+        NameMapper(data={'name': 'bob'}).marshal()
+
+
+
+def get_async_getter(awaitable):
+
+    async def getter(session):
+        return TestType(id=session.data['id'])
+
+    if not awaitable:
+        return getter
+
+    def awaitable_getter(session):
+        return getter(session)
+
+    return awaitable_getter
+
+
+@pytest.mark.parametrize('awaitable', [False, True])
+def test_sync_marshal_rejects_async_getter(awaitable):
+
+    PostMapper = get_mappers(get_async_getter(awaitable))
+
+    with pytest.raises(MapperError):
+        PostMapper(data={'title': 'post', 'author': {'id': '1'},
+                         'readers': []}).marshal()
+
+
+@pytest.mark.parametrize('awaitable', [False, True])
+def test_sync_marshal_rejects_async_pooled_getter(awaitable):
+
+    class ReaderMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+
+    class PooledMapper(Mapper):
+
+        __type__ = TestType
+
+        readers = field.Collection(
+            field.Nested(ReaderMapper, getter=get_async_getter(awaitable)),
+            getter_pool=2)
+
+    try:
+        with pytest.raises(MapperError):
+            PooledMapper(data={'readers': [{'id': '1'}]}).marshal()
+    finally:
+        PooledMapper.close_pools()
+
+
+def test_sync_marshal_rejects_async_batch_getter():
+
+    class ReaderMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+
+    async def batch_getter(sessions):
+        return dict((i, TestType(id=s.data['id']))
+                    for i, s in enumerate(sessions))
+
+    class BatchMapper(Mapper):
+
+        __type__ = TestType
+
+        reader = field.Nested(ReaderMapper, batch_getter=batch_getter)
+        readers = field.Collection(
+            field.Nested(ReaderMapper, batch_getter=batch_getter))
+
+    with pytest.raises(MapperError):
+        BatchMapper(data={'readers': [{'id': '1'}]}).marshal()
+
+    with pytest.raises(MapperError):
+        BatchMapper(data={'reader': {'id': '1'}, 'readers': []}).marshal()
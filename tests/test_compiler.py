@@ -0,0 +1,480 @@
+from datetime import datetime, date
+
+from kim.mapper import Mapper
+from kim.field import (
+    Field, String, Integer, Float, Decimal as DecimalField, Boolean, DateTime, Date,
+    Static, Nested, Collection)
+import pytest
+
+from kim.exception import MappingInvalid
+from kim.compiler import (
+    get_serialize_kind, get_marshal_pipes, serialize_column, MarshalPlan)
+from kim.pipelines.base import is_valid_choice
+from kim.pipelines.string import is_valid_string, blank_check, to_unicode
+from kim.pipelines.string import bounds_check
+from kim.role import whitelist
+
+from .helpers import TestType
+
+
+def add_prefix(session):
+    session.data = 'prefix-%s' % session.data
+    return session.data
+
+
+def get_mappers(compiled):
+
+    suffix = 'Compiled' if compiled else 'Generic'
+
+    AddressMapper = type(Mapper)('AddressMapper' + suffix, (Mapper, ), {
+        '__type__': TestType,
+        '__compile__': compiled,
+        'street': String(),
+        'postcode': String(source='code.value'),
+        '__roles__': {
+            'street': whitelist('street'),
+        }
+    })
+
+    UserMapper = type(Mapper)('UserMapper' + suffix, (Mapper, ), {
+        '__type__': TestType,
+        '__compile__': compiled,
+        'id': Integer(),
+        'name': String(extra_serialize_pipes={'process': [add_prefix]}),
+        'score': Float(precision=2),
+        'balance': DecimalField(precision=3),
+        'active': Boolean(default=False),
+        'created_at': DateTime(),
+        'signup_date': Date(),
+        'object_type': Static(value='user'),
+        'address': Nested(AddressMapper, null_default={}),
+        'addresses': Collection(Nested(AddressMapper)),
+        'tags': Collection(String(), default=[]),
+        'escaped': String(name='foo\\.bar', source='escaped'),
+        'me': Nested(AddressMapper, source='__self__', role='street'),
+        '__roles__': {
+            'public': whitelist('id', 'name'),
+        }
+    })
+
+    return UserMapper
+
+
+def make_user(**kwargs):
+
+    attrs = dict(
+        id=2,
+        name='mike',
+        score=1.23456,
+        balance='1.2345',
+        active=None,
+        created_at=datetime(2016, 1, 1, 10, 30),
+        signup_date=date(2016, 1, 2),
+        street='old st',
+        code=TestType(value='E1'),
+        address=TestType(street='high st', code={'value': 'N1'}),
+        addresses=[TestType(street='low st', code=None)],
+        tags=None,
+        escaped='esc',
+    )
+    attrs.update(kwargs)
+    return TestType(**attrs)
+
+
+def test_get_serialize_kind():
+
+    assert get_serialize_kind(String()) == 'plain'
+    assert get_serialize_kind(DateTime()) == 'datetime'
+    assert get_serialize_kind(Date()) == 'datetime'
+    assert get_serialize_kind(DecimalField()) == 'decimal'
+    assert get_serialize_kind(Float()) == 'float'
+    assert get_serialize_kind(Static(value=1)) == 'static'
+    assert get_serialize_kind(Nested('Foo')) == 'nested'
+    assert get_serialize_kind(Collection(String())) == 'collection'
+    assert get_serialize_kind(
+        String(extra_serialize_pipes={'output': [add_prefix]})) is None
+    assert get_serialize_kind(Collection(
+        String(extra_serialize_pipes={'output': [add_prefix]}))) is None
+
+
+def test_get_serialize_kind_custom_serialize():
+
+    class MyField(String):
+
+        def serialize(self, mapper_session, **opts):
+            pass
+
+    assert get_serialize_kind(MyField()) is None
+
+
+def test_compiled_serialize_matches_pipelines():
+
+    user = make_user()
+
+    expected = get_mappers(compiled=False)(obj=user).serialize()
+    result = get_mappers(compiled=True)(obj=user).serialize()
+
+    assert result == expected
+    assert result == {
+        'id': 2,
+        'name': 'prefix-mike',
+        'score': '1.23',
+        'balance': '1.234',
+        'active': False,
+        'created_at': '2016-01-01T10:30:00',
+        'signup_date': '2016-01-02',
+        'object_type': 'user',
+        'address': {'street': 'high st', 'postcode': 'N1'},
+        'addresses': [{'street': 'low st', 'postcode': None}],
+        'tags': [],
+        'foo.bar': 'esc',
+        'me': {'street': 'old st'},
+    }
+
+
+def test_compiled_serialize_none_values():
+
+    user = make_user(score=None, balance=None, created_at=None, address=None,
+                     addresses=None, tags=['a', 'b'])
+
+    expected = get_mappers(compiled=False)(obj=user).serialize()
+    result = get_mappers(compiled=True)(obj=user).serialize()
+
+    assert result == expected
+    assert result['address'] == {}
+    assert result['addresses'] is None
+    assert result['tags'] == ['a', 'b']
+
+
+def test_compiled_serialize_dict_obj():
+
+    user = make_user().__dict__
+
+    expected = get_mappers(compiled=False)(obj=user).serialize()
+    result = get_mappers(compiled=True)(obj=user).serialize()
+
+    assert result == expected
+
+
+def test_compiled_serialize_role():
+
+    UserMapper = get_mappers(compiled=True)
+
+    result = UserMapper(obj=make_user()).serialize(role='public')
+    assert result == {'id': 2, 'name': 'prefix-mike'}
+
+    serializer = UserMapper(obj={})._get_serializer('public')
+    UserMapper(obj=make_user()).serialize(role='public')
+    assert UserMapper(obj={})._get_serializer('public') is serializer
+
+
+def test_compiled_serialize_role_instance_and_deferred_role():
+
+    UserMapper = get_mappers(compiled=True)
+    mapper = UserMapper(obj=make_user())
+
+    assert mapper.serialize(role=whitelist('id')) == {'id': 2}
+    assert mapper.serialize(role='public', deferred_role=whitelist('name')) == {
+        'name': 'prefix-mike'}
+    assert mapper._get_serializer(whitelist('id')) is \
+        mapper._get_serializer(whitelist('id'))
+
+
+
+def test_compiled_caches_are_bounded(monkeypatch):
+
+    monkeypatch.setattr('kim.mapper.ROLE_CACHE_SIZE', 2)
+
+    UserMapper = get_mappers(compiled=True)
+    mapper = UserMapper(obj=make_user())
+
+    for name in ('id', 'name', 'score', 'id'):
+        assert list(mapper.serialize(deferred_role=whitelist(name))) == [name]
+    assert len(UserMapper._compiled_serializers) == 2
+    assert ('__default__', (frozenset(['name']), True)) not in \
+        UserMapper._compiled_serializers
+
+    marshal_mapper = UserMapper(data={'id': 2})
+    for name in ('id', 'name', 'score', 'id'):
+        marshal_mapper._get_marshal_plan(whitelist(name))
+    assert len(UserMapper._marshal_plans) == 2
+    assert (((frozenset(['name']), True), None), False) not in \
+        UserMapper._marshal_plans
+
+def get_marshal_mapper(compiled):
+
+    suffix = 'Compiled' if compiled else 'Generic'
+
+    AddressMapper = type(Mapper)('AddressMapper' + suffix, (Mapper, ), {
+        '__type__': TestType,
+        '__compile__': compiled,
+        'street': String(),
+    })
+
+    return type(Mapper)('UserMapper' + suffix, (Mapper, ), {
+        '__type__': TestType,
+        '__compile__': compiled,
+        'id': Integer(read_only=True),
+        'name': String(min=2),
+        'status': String(choices=['active', 'inactive'], default='active'),
+        'age': Integer(required=False, allow_none=False),
+        'nickname': String(required=False),
+        'address': Nested(AddressMapper, allow_create=True),
+        'tags': Collection(String(), required=False),
+        '__roles__': {
+            'name_only': whitelist('name'),
+        }
+    })
+
+
+def marshal(compiled, data, **kwargs):
+
+    mapper = get_marshal_mapper(compiled)(data=data, **kwargs)
+    try:
+        return mapper.marshal(), None
+    except MappingInvalid as e:
+        return None, e.errors
+
+
+def test_get_marshal_pipes():
+
+    assert get_marshal_pipes(String()) == (is_valid_string, to_unicode)
+    assert get_marshal_pipes(String(blank=False, choices=['a'], max=2)) == (
+        is_valid_string, blank_check, is_valid_choice, bounds_check, to_unicode)
+    assert get_marshal_pipes(
+        String(extra_marshal_pipes={'output': [add_prefix]})) is None
+
+
+def test_marshal_plan_skips_read_only():
+
+    plan = MarshalPlan([Integer(name='id', read_only=True), String(name='name')])
+
+    assert [step[0].name for step in plan.steps] == ['name']
+
+
+def test_compiled_marshal_matches_pipelines():
+
+    data = {'id': 1, 'name': 'mike', 'age': '31', 'nickname': None,
+            'address': {'street': 'high st'}, 'tags': ['a', 1]}
+
+    expected, _ = marshal(False, data)
+    result, errors = marshal(True, data)
+
+    assert errors is None
+    assert result == expected
+    assert result.__dict__ == {
+        'name': 'mike', 'status': 'active', 'age': 31, 'nickname': None,
+        'address': TestType(street='high st'), 'tags': ['a', '1']}
+
+
+def test_compiled_marshal_errors_match_pipelines():
+
+    data = {'name': 'm', 'status': 'unknown', 'age': None, 'address': {}}
+
+    _, expected = marshal(False, data)
+    _, errors = marshal(True, data)
+
+    assert errors == expected
+    assert errors == {
+        'name': 'value out of allowed range',
+        'status': 'invalid choice',
+        'age': 'This field cannot be null',
+        'address': {'street': 'This is a required field'},
+    }
+
+
+def test_compiled_marshal_partial():
+
+    obj = TestType(name='mike', status='inactive')
+    data = {'id': 3, 'age': 10}
+
+    expected, _ = marshal(False, data, obj=TestType(**obj.__dict__), partial=True)
+    result, errors = marshal(True, data, obj=obj, partial=True)
+
+    assert errors is None
+    assert result == expected
+    assert result.__dict__ == {'name': 'mike', 'status': 'inactive', 'age': 10}
+
+
+def test_compiled_marshal_plan_cached_per_role_and_partial():
+
+    UserMapper = get_marshal_mapper(compiled=True)
+
+    mapper = UserMapper(data={'name': 'mike'})
+    partial_mapper = UserMapper(data={'name': 'mike'}, obj=TestType(), partial=True)
+
+    plan = mapper._get_marshal_plan('name_only')
+    partial_plan = partial_mapper._get_marshal_plan('name_only')
+
+    assert plan is not partial_plan
+    assert plan.partial is False
+    assert partial_plan.partial is True
+    assert mapper._get_marshal_plan('name_only') is plan
+    assert partial_mapper._get_marshal_plan('name_only') is partial_plan
+
+
+@pytest.mark.parametrize('accessor', ['attr', 'dict'])
+def test_compiled_serialize_accessor(accessor):
+
+    user = make_user(address=None)
+    if accessor == 'dict':
+        user = user.__dict__
+        user['code'] = {'value': 'E1'}
+
+    UserMapper = type(Mapper)('UserMapper' + accessor, (Mapper, ), {
+        '__type__': TestType,
+        '__compile__': True,
+        '__accessor__': accessor,
+        'id': Integer(),
+        'postcode': String(source='code.value'),
+        'missing': String(source='address.street'),
+    })
+
+    serializer = UserMapper(obj=user)._get_serializer('__default__')
+    assert '_is_dict' not in serializer.source
+    assert UserMapper(obj=user).serialize() == {
+        'id': 2, 'postcode': 'E1', 'missing': None}
+
+
+def test_compiled_serialize_raw():
+
+    class Row(TestType):
+
+        def keys(self):
+            return list(self.__dict__)
+
+    UserMapper = type(Mapper)('UserMapperRaw', (Mapper, ), {
+        '__type__': TestType,
+        '__compile__': True,
+        '__accessor__': 'attr',
+        'id': Integer(),
+        'user': String(source='user.name'),
+    })
+
+    row = Row(id=1, user__name='bob')
+    assert UserMapper(obj=row, raw=True).serialize() == {'id': 1, 'user': 'bob'}
+    assert UserMapper(obj=row).serialize(raw=True) == {'id': 1, 'user': 'bob'}
+
+
+def test_compiled_marshal_accessor():
+
+    UserMapper = type(Mapper)('UserMapperDict', (Mapper, ), {
+        '__type__': dict,
+        '__compile__': True,
+        '__accessor__': 'dict',
+        'id': Integer(),
+        'postcode': String(source='code.value'),
+    })
+
+    result = UserMapper(data={'id': 1, 'postcode': 'E1'},
+                        obj={'code': {}}).marshal()
+
+    assert result == {'id': 1, 'code': {'value': 'E1'}}
+
+
+def test_serialize_column():
+
+    assert serialize_column(DateTime(), [datetime(2016, 1, 1), None]) == [
+        '2016-01-01T00:00:00', None]
+    assert serialize_column(Float(precision=1, default=0), [1.26, None]) == [
+        '1.3', 0]
+    assert serialize_column(Collection(DecimalField(precision=1)), [
+        ['1.22', 2], None, []]) == [['1.2', '2.0'], None, []]
+
+
+def test_serialize_batch_matches_serialize():
+
+    users = [
+        make_user(),
+        make_user(score=None, balance=None, created_at=None, address=None,
+                  addresses=None, tags=['a', 'b']),
+        make_user(addresses=[]).__dict__,
+    ]
+
+    UserMapper = get_mappers(compiled=False)
+
+    assert UserMapper.many().serialize_batch(users) == \
+        UserMapper.many().serialize(users)
+    assert UserMapper.many().serialize_batch(users, role='public') == \
+        UserMapper.many().serialize(users, role='public')
+    assert UserMapper.many().serialize_batch([]) == []
+
+
+
+def test_serialize_batch_reuses_mapper():
+
+    mappers = []
+
+    def record_mapper(session):
+        assert session.mapper.obj is session.data
+        mappers.append(session.mapper)
+        session.data = session.data.id
+        return session.data
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        me = Field(source='__self__',
+                   extra_serialize_pipes={'process': [record_mapper]})
+
+    users = [TestType(id=i) for i in range(3)]
+
+    assert UserMapper.many().serialize_batch(users) == [
+        {'id': i, 'me': i} for i in range(3)]
+    assert len(mappers) == 3
+    assert len(set(map(id, mappers))) == 1
+
+def test_serialize_batch_collection_generator():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        tags = Collection(String())
+
+    users = [TestType(id=1, tags=(t for t in ['a', 'b'])),
+             TestType(id=2, tags=None)]
+
+    assert UserMapper.many().serialize_batch(users) == [
+        {'id': 1, 'tags': ['a', 'b']}, {'id': 2, 'tags': None}]
+
+
+def test_compiled_marshal_collects_pending_errors():
+
+    from kim.exception import PendingError
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+        __compile__ = True
+
+        id = Integer(required=True)
+        name = String(required=True)
+
+    mapper = UserMapper(data={'id': 'abc', 'name': None})
+    with pytest.raises(MappingInvalid) as e:
+        mapper.marshal()
+
+    assert isinstance(e.value.pending_errors['id'], PendingError)
+    assert e.value.errors == {'id': 'Invalid type',
+                              'name': 'This is a required field'}
+    assert mapper.errors is e.value.pending_errors
+
+
+def test_compiled_marshal_fail_fast():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+        __compile__ = True
+
+        id = Integer(required=True)
+        name = String(required=True)
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data={'id': 'abc', 'name': None}).marshal(fail_fast=True)
+
+    assert e.value.errors == {'id': 'Invalid type'}
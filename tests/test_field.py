@@ -70,6 +70,32 @@ def test_field_source_defaults_to_name():
     assert new_field.opts.name == 'other_field'
 
 
+def test_field_name_and_source_paths_set():
+    new_field = Field(name='foo\\.bar', source='baz.qux')
+
+    assert new_field.opts.output_name == 'foo.bar'
+    assert new_field.opts.name_path == ('foo.bar', )
+    assert new_field.opts.source_path == ('baz', 'qux')
+    assert new_field.opts.name_getter({'foo.bar': 1}) == 1
+    assert new_field.opts.source_getter({'baz': {'qux': 2}}) == 2
+
+    output = {'baz': {}}
+    new_field.opts.source_setter(output, 3)
+    assert output == {'baz': {'qux': 3}}
+
+
+def test_field_name_and_source_paths_unset():
+    new_field = Field()
+
+    assert new_field.opts.output_name is None
+    assert new_field.opts.name_getter is None
+    assert new_field.opts.source_setter is None
+
+    new_field.name = 'foo'
+    assert new_field.opts.output_name == 'foo'
+    assert new_field.opts.source_path == ('foo', )
+
+
 def test_get_field_name():
     invalid_field = Field(
         required=True,
@@ -154,3 +180,34 @@ def test_field_invalid_opts_class():
     with pytest.raises(FieldError):
 
         PhoneNumber()
+
+
+
+def test_field_pipes_changed_after_first_run():
+
+    from .conftest import get_mapper_session
+
+    def upper(session):
+        session.data = session.data.upper()
+        return session.data
+
+    field = Field(name='name')
+    output = {}
+    field.marshal(get_mapper_session(data={'name': 'bob'}, output=output))
+    assert output == {'name': 'bob'}
+
+    field.marshal_pipes.insert(-1, upper)
+    field.marshal(get_mapper_session(data={'name': 'bob'}, output=output))
+    assert output == {'name': 'BOB'}
+
+    field.marshal_pipes.remove(upper)
+    field.marshal(get_mapper_session(data={'name': 'bob'}, output=output))
+    assert output == {'name': 'bob'}
+
+    pipes = list(field.serialize_pipes)
+    field.serialize_pipes = pipes[:-1] + [upper] + pipes[-1:]
+    pipes.append(upper)  # the field keeps its own copy
+
+    output = {}
+    field.serialize(get_mapper_session(obj={'name': 'bob'}, output=output))
+    assert output == {'name': 'BOB'}
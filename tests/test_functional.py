@@ -560,6 +560,17 @@ def test_serialize_polymorphic_mapper_many():
     ]
 
 
+def test_serialize_batch_polymorphic_mapper():
+
+    obj1 = TestType(id=2, name='bob', location='London', object_type='event')
+    obj2 = TestType(id=3, name='fred', status='Done', object_type='task')
+
+    result = SchedulableMapper.many().serialize_batch([obj1, obj2], role='public')
+
+    assert result == SchedulableMapper.many().serialize(
+        [obj1, obj2], role='public')
+
+
 def test_serialize_polymorphic_mapper_many_with_deferred_role():
 
     obj1 = TestType(id=2, name='bob', location='London', object_type='event')
@@ -1,9 +1,10 @@
 import pytest
 
-from kim.exception import MapperError, MappingInvalid
+from kim.exception import MapperError, MappingInvalid, PendingError
 from kim.mapper import (
     Mapper, _MapperConfig, get_mapper_from_registry, PolymorphicMapper)
 from kim.field import Field, String, Integer, Nested, Collection
+from kim.pipelines.base import pipe
 from kim.role import whitelist, blacklist
 
 from .fixtures import SchedulableMapper, EventMapper, TaskMapper
@@ -583,6 +584,177 @@ def test_mapper_marshal_many():
     assert (res2.name, res2.id) == ('bob', 2)
 
 
+def test_mapper_iter_serialize():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+    consumed = []
+
+    def objs():
+        for i in range(3):
+            consumed.append(i)
+            yield TestType(id=i, name='bob')
+
+    result = MapperBase.many().iter_serialize(objs())
+
+    assert consumed == []
+    assert next(result) == {'id': 0, 'name': 'bob'}
+    assert consumed == [0]
+    assert list(result) == [{'id': 1, 'name': 'bob'}, {'id': 2, 'name': 'bob'}]
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_mapper_serialize_many_workers(executor):
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+        __roles__ = {
+            'id': whitelist('id'),
+        }
+
+    objs = [TestType(id=i, name='bob') for i in range(7)]
+
+    with MapperBase.many(workers=2, executor=executor,
+                         chunk_size=3) as mappers:
+        assert mappers.serialize(objs, role='id') == [
+            {'id': i} for i in range(7)]
+
+        pool = mappers.get_pool()
+        assert mappers.serialize(objs[:2]) == [
+            {'id': 0, 'name': 'bob'}, {'id': 1, 'name': 'bob'}]
+        assert mappers.get_pool() is pool
+
+    assert mappers._pool is None
+
+
+
+@pytest.mark.parametrize('owned', [False, True])
+def test_mapper_iter_serialize_workers_is_lazy(owned):
+
+    from concurrent.futures import ThreadPoolExecutor
+    from kim.parallel import CHUNKS_PER_WORKER
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+    consumed = []
+
+    def objs():
+        for i in range(100):
+            consumed.append(i)
+            yield TestType(id=i)
+
+    executor = ThreadPoolExecutor(2) if owned else 'thread'
+    try:
+        with MapperBase.many(workers=2, executor=executor,
+                             chunk_size=1) as mappers:
+            result = mappers.iter_serialize(objs())
+
+            assert next(result) == {'id': 0}
+            assert len(consumed) <= CHUNKS_PER_WORKER * 2
+            assert list(result) == [{'id': i} for i in range(1, 100)]
+    finally:
+        if owned:
+            executor.shutdown()
+
+def as_tuple(session):
+    session.data = (session.data, session.data)
+    return session.data
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_mapper_serialize_many_workers_returns_serialized_objects(executor):
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer(extra_serialize_pipes={'process': [as_tuple]})
+        obj = Field(required=False)
+
+    objs = [TestType(id=i, obj=frozenset([i])) for i in range(3)]
+
+    with MapperBase.many(workers=2, executor=executor, chunk_size=2) as mappers:
+        result = mappers.serialize(objs)
+
+    assert result == MapperBase.many().serialize(objs)
+    assert result[1] == {'id': (1, 1), 'obj': frozenset([1])}
+
+
+def test_mapper_serialize_many_caller_executor():
+
+    from concurrent.futures import ThreadPoolExecutor
+    from multiprocessing.pool import ThreadPool
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+    objs = [TestType(id=i) for i in range(5)]
+    expected = [{'id': i} for i in range(5)]
+
+    pool = ThreadPool(2)
+    executor = ThreadPoolExecutor(2)
+    try:
+        for owned in (pool, executor):
+            with MapperBase.many(executor=owned, chunk_size=2) as mappers:
+                assert mappers.get_pool() is owned
+                assert mappers.serialize(objs) == expected
+
+        # pools owned by the caller aren't closed
+        assert pool.map(len, ['ab']) == [2]
+    finally:
+        pool.close()
+        pool.join()
+        executor.shutdown()
+
+
+def test_mapper_serialize_many_invalid_executor():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+    with pytest.raises(MapperError):
+        MapperBase.many(workers=2, executor='foo').serialize([TestType(id=1)])
+
+
+def test_mapper_iter_marshal():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+    data = iter([{'name': 'mike', 'id': 1}, {'id': 2}])
+
+    result = MapperBase.many().iter_marshal(data)
+
+    res1 = next(result)
+    assert (res1.name, res1.id) == ('mike', 1)
+    with pytest.raises(MappingInvalid):
+        next(result)
+
+
 def test_mapper_marshal_many_with_role():
 
     class MapperBase(Mapper):
@@ -858,6 +1030,130 @@ def test_get_fields_with_invalid_role():
         mapper._get_fields('invalid')
 
 
+def test_get_fields_cached_per_role():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+        secret = String()
+
+        __roles__ = {
+            'private': blacklist('secret'),
+        }
+
+    mapper = MapperBase(data={})
+    key, fields = mapper._get_role_fields('private')
+    assert fields == (MapperBase.fields['id'], MapperBase.fields['name'])
+
+    # Resolved fields are shared by every instance of the mapper
+    assert MapperBase(data={})._get_role_fields('private')[1] is fields
+
+
+def test_get_fields_cache_invalidated_when_role_replaced():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+        __roles__ = {
+            'public': whitelist('id'),
+        }
+
+    mapper = MapperBase(data={})
+    assert mapper._get_fields('public') == [MapperBase.fields['id']]
+
+    MapperBase.roles['public'] = whitelist('name')
+    assert mapper._get_fields('public') == [MapperBase.fields['name']]
+
+    del MapperBase.roles['public']
+    with pytest.raises(MapperError):
+        mapper._get_fields('public')
+
+
+def test_get_fields_cached_for_dynamic_roles():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+        secret = String()
+
+    mapper = MapperBase(data={})
+
+    key, fields = mapper._get_role_fields(whitelist('id', 'name'))
+    assert fields == (MapperBase.fields['id'], MapperBase.fields['name'])
+    assert mapper._get_role_fields(whitelist('name', 'id'))[1] is fields
+    assert mapper._get_role_fields(blacklist('id', 'name'))[1] == (
+        MapperBase.fields['secret'], )
+
+    key, fields = mapper._get_role_fields(
+        '__default__', deferred_role=whitelist('secret'))
+    assert fields == (MapperBase.fields['secret'], )
+    assert mapper._get_role_fields(
+        '__default__', deferred_role=whitelist('name'))[1] == (
+        MapperBase.fields['name'], )
+
+    with pytest.raises(MapperError):
+        mapper._get_role_fields('__default__', deferred_role=['name'])
+
+
+
+def test_get_role_fields_cache_is_bounded(monkeypatch):
+
+    monkeypatch.setattr('kim.mapper.ROLE_CACHE_SIZE', 2)
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+        secret = String()
+
+    mapper = MapperBase(obj=TestType(id=1, name='bob', secret='x'))
+    for name in ('id', 'name', 'secret', 'name'):
+        assert mapper.serialize(deferred_role=whitelist(name)) == {
+            name: getattr(mapper.obj, name)}
+
+    assert len(MapperBase._field_cache) == 2
+    key = ('__default__', (frozenset(['id']), True))
+    assert key not in MapperBase._field_cache
+    key = ('__default__', (frozenset(['name']), True))
+    assert key in MapperBase._field_cache
+
+def test_get_fields_partial_marshal():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String(name='full\\.name')
+        email = String(name='email_address')
+        secret = String()
+
+        __roles__ = {
+            'public': blacklist('secret'),
+        }
+
+    data = {'full.name': 'bob', 'email': 'ignored', 'secret': 'x'}
+    mapper = MapperBase(data=data, obj=TestType(), partial=True)
+
+    assert mapper._get_fields('public', for_marshal=True) == [
+        MapperBase.fields['name']]
+    assert mapper._get_fields('public') == [
+        MapperBase.fields['id'], MapperBase.fields['name'],
+        MapperBase.fields['email']]
+
+
 def test_mapper_with_invalid_role_type():
 
     with pytest.raises(MapperError):
@@ -873,6 +1169,51 @@ def test_mapper_with_invalid_role_type():
             }
 
 
+def test_mapper_with_invalid_accessor():
+
+    with pytest.raises(MapperError):
+        class MapperBase(Mapper):
+
+            __type__ = TestType
+            __accessor__ = 'foo'
+
+            id = Integer()
+
+
+def test_mapper_accessor_requires_compile():
+
+    with pytest.raises(MapperError):
+        class MapperBase(Mapper):
+
+            __type__ = TestType
+            __accessor__ = 'attr'
+
+            id = Integer()
+
+
+def test_mapper_binds_accessors():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+        __compile__ = True
+        __accessor__ = 'attr'
+
+        id = Integer()
+        name = String(source='user.name')
+        me = Nested('MapperBase', source='__self__')
+
+    assert sorted(MapperBase._accessors.keys()) == ['id', 'user.name']
+
+    getter, setter = MapperBase._accessors['user.name']
+    obj = TestType(user=TestType(name='mike'))
+    assert getter(obj) == 'mike'
+    assert getter(TestType()) is None
+
+    setter(obj, 'jack')
+    assert obj.user.name == 'jack'
+
+
 def test_mapper_marshal_update():
 
     class MapperBase(Mapper):
@@ -1070,3 +1411,543 @@ def test_mapper_with_invalid_collection_fields_sets_errors():
         mapper.marshal()
 
     assert mapper.errors == {'users': {'id': 'This is a required field'}}
+
+
+def test_mapper_reuses_session_between_fields():
+
+    sessions = []
+
+    def record_session(session):
+        sessions.append(session)
+
+    pipes = {'process': [record_session]}
+
+    class InnerMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String(extra_serialize_pipes=pipes, extra_marshal_pipes=pipes)
+
+    class OuterMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String(extra_serialize_pipes=pipes, extra_marshal_pipes=pipes)
+        name = String(extra_serialize_pipes=pipes, extra_marshal_pipes=pipes)
+        users = Collection(Nested(InnerMapper, allow_create=True))
+
+    obj = TestType(id='1', name='bob',
+                   users=[TestType(name='a'), TestType(name='b')])
+    data = {'id': '1', 'name': 'bob', 'users': [{'name': 'a'}, {'name': 'b'}]}
+
+    assert OuterMapper(obj=obj).serialize() == data
+    assert sessions[0] is sessions[1]
+    assert len(set(map(id, sessions[2:]))) == 2
+
+    del sessions[:]
+    result = OuterMapper(data=data).marshal()
+    assert [u.name for u in result.users] == ['a', 'b']
+    assert sessions[0] is sessions[1]
+
+
+def test_mapper_bind():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String(required=True)
+
+    parent = UserMapper(data={})
+    mapper = UserMapper(data={}, parent=parent)
+    with pytest.raises(MappingInvalid):
+        mapper.marshal()
+    assert mapper.errors
+
+    obj = TestType(id='1')
+    assert mapper.bind(obj=obj) is mapper
+    assert mapper.obj is obj
+    assert mapper.data is None
+    assert mapper.errors == {}
+    assert mapper.parent is parent
+    assert mapper.serialize() == {'id': '1'}
+
+    with pytest.raises(MapperError):
+        mapper.bind()
+
+
+def test_mapper_iterator_rebinds_mapper():
+
+    mappers = []
+
+    def record_mapper(session):
+        mappers.append(session.mapper)
+
+    pipes = {'process': [record_mapper]}
+
+    class InnerMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String(extra_serialize_pipes=pipes, extra_marshal_pipes=pipes)
+
+    class OuterMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String(extra_serialize_pipes=pipes, extra_marshal_pipes=pipes)
+        users = Collection(Nested(InnerMapper, allow_create=True))
+
+    objs = [TestType(id=str(i), users=[TestType(name='a'), TestType(name='b')])
+            for i in range(3)]
+
+    result = OuterMapper.many().serialize(objs)
+    assert [r['id'] for r in result] == ['0', '1', '2']
+    assert [[u['name'] for u in r['users']] for r in result] == [['a', 'b']] * 3
+    assert len(set(id(m) for m in mappers if isinstance(m, OuterMapper))) == 1
+    assert len(set(id(m) for m in mappers if isinstance(m, InnerMapper))) == 3
+
+    del mappers[:]
+    data = [{'id': str(i), 'users': [{'name': 'a'}]} for i in range(3)]
+    result = OuterMapper.many().marshal(data)
+    assert [r.id for r in result] == ['0', '1', '2']
+    assert len(set(id(m) for m in mappers if isinstance(m, OuterMapper))) == 1
+
+
+def test_mapper_iterator_does_not_rebind_custom_init():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String()
+
+        def __init__(self, *args, **kwargs):
+            super(UserMapper, self).__init__(*args, **kwargs)
+            self.created = True
+
+    class PolyMapper(PolymorphicMapper):
+
+        __type__ = TestType
+
+        object_type = String()
+
+        __mapper_args__ = {
+            'polymorphic_on': 'object_type',
+        }
+
+    assert not UserMapper._is_rebindable()
+    assert not PolyMapper._is_rebindable()
+
+    objs = [TestType(id='1'), TestType(id='2')]
+    mappers = list(UserMapper.many()._iter_mappers(objs=objs))
+    assert mappers[0] is not mappers[1]
+
+
+def test_mapper_prepare():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+        __compile__ = True
+
+        id = String()
+        name = String()
+        manager = Nested('UserMapper', role='public', required=False)
+
+        __roles__ = {
+            'public': whitelist('id', 'name'),
+        }
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        title = String()
+        readers = Collection(Nested(UserMapper, role='public'))
+
+    assert PostMapper.prepare() is PostMapper
+    assert ('__default__', None) in PostMapper._field_cache
+    assert ('public', None) in UserMapper._field_cache
+    assert ('public', None) in UserMapper._compiled_serializers
+    assert (('public', None), True) in UserMapper._marshal_plans
+
+    UserMapper.prepare(roles=['__default__'])
+    assert ('__default__', None) in UserMapper._compiled_serializers
+
+    with pytest.raises(MapperError):
+        UserMapper.prepare(roles=['unknown'])
+
+
+def test_mapper_serialize_obj_and_marshal_data():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String(required=True)
+        name = String()
+
+        __roles__ = {
+            'public': whitelist('name'),
+        }
+
+    user = TestType(id='1', name='bob')
+    assert UserMapper.serialize_obj(user) == {'id': '1', 'name': 'bob'}
+    assert UserMapper.serialize_obj(user, role='public') == {'name': 'bob'}
+
+    result = UserMapper.marshal_data({'id': '2', 'name': 'jack'})
+    assert (result.id, result.name) == ('2', 'jack')
+
+    result = UserMapper.marshal_data({'name': 'mike'}, obj=user, partial=True)
+    assert result is user
+    assert user.name == 'mike'
+
+    with pytest.raises(MappingInvalid):
+        UserMapper.marshal_data({'name': 'mike'})
+
+
+def test_mapper_iterator_get_mapper_does_not_change_params():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String()
+
+    iterator = UserMapper.many(partial=True)
+    mapper = iterator.get_mapper(obj=TestType(id='1'))
+
+    assert mapper.partial is True
+    assert iterator.mapper_params == {'partial': True}
+
+
+def test_mapper_thread_safety():
+
+    import threading
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String(required=True)
+        name = String()
+
+        __roles__ = {
+            'public': whitelist('id'),
+        }
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String(required=True)
+        readers = Collection(Nested(UserMapper, allow_create=True))
+
+    PostMapper.prepare()
+    iterator = PostMapper.many()
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(100):
+                key = '%s-%s' % (n, i)
+                readers = [TestType(id=key, name='u%s' % j) for j in range(3)]
+                post = TestType(id=key, readers=readers)
+                expected = {'id': key, 'readers': [
+                    {'id': key, 'name': 'u%s' % j} for j in range(3)]}
+
+                assert PostMapper.serialize_obj(post) == expected
+                assert iterator.serialize([post, post]) == [expected] * 2
+
+                result = PostMapper.marshal_data(expected)
+                assert result.id == key
+                assert [r.name for r in result.readers] == ['u0', 'u1', 'u2']
+
+                marshaled = iterator.marshal([expected])
+                assert marshaled[0].readers[2].id == key
+
+                try:
+                    PostMapper.marshal_data({'id': key, 'readers': [{'name': 'a'}]})
+                except MappingInvalid as e:
+                    assert e.errors == {
+                        'readers': {'id': 'This is a required field'}}
+                else:
+                    raise AssertionError('marshal_data did not raise')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_mapper_marshal_skips_read_only_fields():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = String(read_only=True)
+        name = String()
+
+    mapper = UserMapper(data={'id': '2', 'name': 'bob'})
+    assert mapper._get_fields('__default__', for_marshal=True) == [
+        UserMapper.fields['name']]
+    assert [f.name for f in mapper._get_fields('__default__')] == ['id', 'name']
+
+    user = TestType(id='1', name='mike')
+    result = UserMapper(obj=user, data={'id': '2', 'name': 'bob'}).marshal()
+    assert (result.id, result.name) == ('1', 'bob')
+
+    result = UserMapper(obj=user, data={'id': '3'}, partial=True).marshal()
+    assert (result.id, result.name) == ('1', 'bob')
+
+
+def test_mapping_invalid_formats_pending_errors():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = Integer(required=True)
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String(choices=['bob'])
+        user = Nested(UserMapper, allow_create=True)
+
+    data = {'id': 'abc', 'name': 'mike', 'user': {}}
+
+    with pytest.raises(MappingInvalid) as e:
+        MapperBase(data=data).marshal()
+
+    pending = e.value.pending_errors
+    assert isinstance(pending['id'], PendingError)
+    assert isinstance(pending['user']['id'], PendingError)
+
+    expected = {
+        'id': 'Invalid type',
+        'name': 'invalid choice',
+        'user': {'id': 'This is a required field'},
+    }
+    assert e.value.errors == expected
+    assert pending == expected
+
+
+def test_marshal_fail_fast():
+
+    calls = []
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = Integer(required=True)
+        name = String(required=True)
+
+    def getter(session):
+        calls.append('getter')
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String(required=True)
+        user = Nested(UserMapper, getter=getter, allow_create=True)
+
+        def validate(self, output):
+            calls.append('validate')
+
+    data = {'id': 'abc', 'user': {}}
+
+    with pytest.raises(MappingInvalid) as e:
+        MapperBase(data=data).marshal(fail_fast=True)
+
+    assert e.value.errors == {'id': 'Invalid type'}
+    assert calls == []
+
+    data = {'id': 1, 'name': 'bob', 'user': {}}
+
+    with pytest.raises(MappingInvalid) as e:
+        MapperBase(data=data).marshal(fail_fast=True)
+
+    assert e.value.errors == {'user': {'id': 'This is a required field'}}
+    assert calls == ['getter']
+
+    with pytest.raises(MappingInvalid) as e:
+        MapperBase(data=data).marshal()
+
+    assert e.value.errors == {'user': {'id': 'This is a required field',
+                                       'name': 'This is a required field'}}
+
+
+def test_mapper_iterator_marshal_fail_fast():
+
+    class FriendMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer(required=True)
+        name = String(required=True)
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer(required=True)
+        name = String(required=True)
+        friends = Collection(Nested(FriendMapper, allow_create=True),
+                             required=False)
+
+    data = [{'id': 1, 'name': 'bob'},
+            {'id': 2, 'name': 'jack', 'friends': [{'id': 'a'}]}]
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper.many().marshal(data, fail_fast=True)
+
+    assert e.value.errors == {'friends': {'id': 'Invalid type'}}
+
+    assert UserMapper.marshal_data(data[0], fail_fast=True).name == 'bob'
+
+
+def test_validate_data():
+
+    calls = []
+
+    class Counted(TestType):
+
+        def __init__(self, *args, **kwargs):
+            calls.append('__type__')
+            super(Counted, self).__init__(*args, **kwargs)
+
+    def process(session):
+        calls.append('process')
+        return session.data
+
+    def getter(session):
+        calls.append('getter')
+
+    class UserMapper(Mapper):
+
+        __type__ = Counted
+
+        id = Integer(required=True)
+
+    class MapperBase(Mapper):
+
+        __type__ = Counted
+
+        id = Integer()
+        name = String(extra_marshal_pipes={'process': [process]})
+        user = Nested(UserMapper, getter=getter, allow_create=True)
+        friends = Collection(Nested(UserMapper, getter=getter,
+                                    allow_create=True), required=False)
+
+        def validate(self, output):
+            calls.append('validate')
+
+    data = {'id': 1, 'name': 'bob', 'user': {'id': 2},
+            'friends': [{'id': 3}]}
+
+    mapper = MapperBase(data=data)
+    assert mapper.validate_data() == {}
+    assert calls == []
+    assert mapper.obj is None
+
+    data = {'id': 'abc', 'user': {}, 'friends': [{'id': 3}, {'id': 'x'}]}
+    assert MapperBase(data=data).validate_data() == {
+        'id': 'Invalid type',
+        'name': 'This is a required field',
+        'user': {'id': 'This is a required field'},
+        'friends': {'id': 'Invalid type'},
+    }
+    assert MapperBase(data=data).validate_data(fail_fast=True) == {
+        'id': 'Invalid type'}
+    assert calls == []
+
+
+def test_validate_data_nested_not_found():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer(required=True)
+
+    def getter(session):
+        return None
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        user = Nested(UserMapper, required=False)
+        editor = Nested(UserMapper, getter=getter, required=False)
+        readers = Collection(Nested(UserMapper), required=False)
+
+    for data in ({'user': {'id': 1}}, {'readers': [{'id': 1}]}):
+        with pytest.raises(MappingInvalid) as e:
+            MapperBase(data=data).marshal()
+        assert MapperBase(data=data).validate_data() == e.value.errors
+
+    # the getter isn't called, the data is only used to find the object
+    assert MapperBase(data={'editor': {'id': 'x'}}).validate_data() == {}
+
+    # updating an existing object in place is allowed
+    class UpdateMapper(Mapper):
+
+        __type__ = TestType
+
+        user = Nested(UserMapper, allow_updates_in_place=True)
+
+    obj = TestType(user=TestType(id=1))
+    assert UpdateMapper(obj=obj, data={'user': {'id': 2}}).validate_data() == {}
+    assert UpdateMapper(data={'user': {'id': 2}}).validate_data() == {
+        'user': 'user not found'}
+
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_marshal_pipe_calling_builtin_pipe(compiled):
+
+    from kim.pipelines.numeric import is_valid_integer
+
+    @pipe()
+    def add_one(session):
+        is_valid_integer(session)
+        session.data = session.data + 1
+        return session.data
+
+    @pipe()
+    def check(session):
+        # the error is recorded but INVALID isn't returned
+        if session.data != 'ok':
+            session.invalid('type_error')
+        return session.data
+
+    class CountMapper(Mapper):
+
+        __type__ = dict
+        __compile__ = compiled
+
+        x = Field(extra_marshal_pipes={'process': [add_one]})
+        y = Field(extra_marshal_pipes={'process': [check]})
+
+    output = {}
+    with pytest.raises(MappingInvalid) as e:
+        CountMapper(data={'x': 'abc', 'y': 'abc'}, obj=output).marshal()
+
+    assert e.value.errors == {'x': 'Invalid type', 'y': 'Invalid type'}
+    assert output == {}
+
+    assert CountMapper(data={'x': '1', 'y': 'ok'}).marshal() == {
+        'x': 2, 'y': 'ok'}
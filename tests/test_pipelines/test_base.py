@@ -1,8 +1,9 @@
 import pytest
 
+from kim.exception import PendingError
 from kim.field import Field, FieldInvalid, FieldError
 from kim.pipelines.base import (
-    Session,
+    INVALID, Session, pipe, get_pipe_steps, run_pipeline,
     get_data_from_source, get_data_from_name, update_output_to_name,
     update_output_to_source, set_default)
 
@@ -223,3 +224,135 @@ def test_set_default_falsy():
     session.data = data['name']
     set_default(session)
     assert session.data == ''
+
+
+def test_session_reset():
+
+    field = Field(name='name')
+    field2 = Field(name='other')
+    parent = Session()
+    session = Session(field, {'name': 'mike'}, {}, parent=parent,
+                      nested_mapper=object, resolved=(None, None))
+
+    output = {}
+    assert session.reset(field2, {'other': 'jack'}, output) is session
+    assert session.field is field2
+    assert session.data == {'other': 'jack'}
+    assert session.output is output
+    assert session.parent is None
+    assert session.mapper_session is None
+    assert session.nested_mapper is None
+    assert session.resolved is None
+
+
+def test_pipe_attributes():
+
+    def upper(session):
+        return session.data.upper()
+
+    wrapped = pipe()(upper)
+    run_if_none = pipe(run_if_none=True)(upper)
+
+    assert wrapped.pipe_func is upper
+    assert wrapped.run_if_none is False
+    assert run_if_none.run_if_none is True
+
+
+def test_get_pipe_steps():
+
+    from functools import wraps
+
+    calls = []
+
+    @pipe()
+    def skip_none(session):
+        calls.append('skip_none')
+
+    @pipe(run_if_none=True)
+    def run_none(session):
+        calls.append('run_none')
+
+    def plain(session):
+        calls.append('plain')
+
+    @wraps(skip_none)
+    def decorated(session):
+        calls.append('decorated')
+        return skip_none(session)
+
+    pipeline = [skip_none, run_none, plain, decorated]
+    assert get_pipe_steps(pipeline) == (
+        (skip_none.pipe_func, False), (run_none.pipe_func, True),
+        (plain, True), (decorated, True))
+
+    field = Field(name='name')
+    output = {}
+    session = Session(field, None, output)
+    assert run_pipeline(pipeline, session, field) is output
+    assert calls == ['run_none', 'plain', 'decorated']
+
+    del calls[:]
+    session = Session(field, 'mike', output)
+    run_pipeline(pipeline, session, field, steps=get_pipe_steps(pipeline))
+    assert calls == ['skip_none', 'run_none', 'plain', 'decorated', 'skip_none']
+
+
+def test_session_invalid():
+
+    field = Field(name='name', error_msgs={'negative': 'is negative'})
+
+    session = Session(field, -1, {})
+    with pytest.raises(FieldInvalid):
+        session.invalid('negative')
+
+    session = Session(field, -1, {}, collect_errors=True)
+    assert session.invalid('negative') is INVALID
+    assert isinstance(session.error, PendingError)
+    assert session.error.format() == 'is negative'
+
+    session.reset(field, 1, {})
+    assert session.error is None
+
+
+def test_invalid_ends_pipeline():
+
+    calls = []
+
+    @pipe()
+    def is_positive(session):
+        calls.append('is_positive')
+        if session.data < 0:
+            return session.invalid('negative')
+
+    @pipe()
+    def update(session):
+        calls.append('update')
+
+    field = Field(name='name')
+    session = Session(field, -1, {}, collect_errors=True)
+    run_pipeline([is_positive, update], session, field)
+
+    assert calls == ['is_positive']
+    assert session.error.error_type == 'negative'
+
+
+def test_get_validation_pipeline():
+
+    from kim.pipelines.collection import (
+        CollectionMarshalPipeline, marshall_collection, validate_collection)
+    from kim.pipelines.nested import NestedMarshalPipeline, validate_nested
+    from kim.pipelines.string import StringMarshalPipeline
+
+    def extra(session):
+        pass
+
+    pipeline = StringMarshalPipeline.get_validation_pipeline(
+        validation=[extra], process=[extra])
+    assert pipeline == (StringMarshalPipeline.input_pipes +
+                        StringMarshalPipeline.validation_pipes + [extra])
+
+    pipeline = CollectionMarshalPipeline.get_validation_pipeline()
+    assert validate_collection in pipeline
+    assert marshall_collection not in pipeline
+
+    assert NestedMarshalPipeline.get_validation_pipeline()[-1] is validate_nested
@@ -1,3 +1,7 @@
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
 import pytest
 
 from kim import Mapper, field
@@ -234,6 +238,211 @@ def test_serialize_nested_collection():
                                 {'id': '2', 'name': 'jack'}]}
 
 
+@pytest.mark.parametrize('getter_pool', [4, ThreadPool(2)])
+def test_marshal_nested_collection_getter_pool(getter_pool):
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+        name = field.String()
+
+    users = dict((str(i), TestType(id=str(i), name='user %s' % i))
+                 for i in range(10))
+    threads = set()
+
+    def getter(session):
+        threads.add(threading.current_thread())
+        time.sleep(0.01)
+        return users.get(session.data['id'])
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        readers = field.Collection(field.Nested(UserMapper, getter=getter),
+                                   getter_pool=getter_pool)
+
+    data = {'readers': [{'id': str(i)} for i in reversed(range(10))]}
+
+    result = PostMapper(data=data).marshal()
+
+    assert result.readers == [users[str(i)] for i in reversed(range(10))]
+    assert threading.current_thread() not in threads
+
+    PostMapper.close_pools()
+
+
+def test_close_getter_pools():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+
+    def getter(session):
+        return TestType(id=session.data['id'])
+
+    owned = ThreadPool(2)
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        readers = field.Collection(field.Nested(UserMapper, getter=getter),
+                                   getter_pool=2)
+        editors = field.Collection(field.Nested(UserMapper, getter=getter),
+                                   getter_pool=owned)
+
+    class BlogMapper(Mapper):
+
+        __type__ = TestType
+
+        posts = field.Collection(field.Nested(PostMapper, allow_create=True))
+
+    data = {'posts': [{'readers': [{'id': '1'}], 'editors': [{'id': '2'}]}]}
+    BlogMapper(data=data).marshal()
+
+    opts = PostMapper.fields['readers'].opts
+    pool = opts._getter_pool
+    assert pool is not None
+
+    BlogMapper.close_pools()
+
+    assert opts._getter_pool is None
+    with pytest.raises(ValueError):
+        pool.map(len, ['a'])
+    assert owned.map(len, ['ab']) == [2]
+
+    # a new pool is created if the mapper is used again
+    result = BlogMapper(data=data).marshal()
+    assert result.posts[0].readers[0].id == '1'
+    assert opts._getter_pool is not pool
+
+    BlogMapper.close_pools()
+    owned.close()
+
+
+def test_marshal_nested_collection_getter_pool_errors():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+
+    def getter(session):
+        if session.data['id'] == '2':
+            raise ValueError(session.data['id'])
+        if session.data['id'] == '3':
+            raise session.field.invalid('not_found')
+        return TestType(id=session.data['id'])
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        readers = field.Collection(field.Nested(UserMapper, getter=getter),
+                                   getter_pool=2)
+
+    with pytest.raises(ValueError) as e:
+        PostMapper(data={'readers': [{'id': '1'}, {'id': '2'}]}).marshal()
+    assert str(e.value) == '2'
+
+    with pytest.raises(MappingInvalid) as e:
+        PostMapper(data={'readers': [{'id': '1'}, {'id': '3'}]}).marshal()
+    assert e.value.errors == {'readers': 'readers not found'}
+
+
+def test_marshal_nested_collection_batch_getter():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+        name = field.String()
+
+    users = {'1': TestType(id='1', name='mike'), '3': TestType(id='3', name='bob')}
+    calls = []
+
+    def batch_getter(sessions):
+        calls.append([s.data['id'] for s in sessions])
+        return dict((i, users.get(s.data['id'])) for i, s in enumerate(sessions))
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        readers = field.Collection(field.Nested(
+            UserMapper, batch_getter=batch_getter, allow_create=True))
+
+    data = {'readers': [{'id': '3'}, {'id': '2', 'name': 'new'}, {'id': '1'}]}
+
+    result = PostMapper(data=data).marshal()
+
+    assert calls == [['3', '2', '1']]
+    assert result.readers[0] is users['3']
+    assert (result.readers[1].id, result.readers[1].name) == ('2', 'new')
+    assert result.readers[2] is users['1']
+
+    PostMapper(data={'readers': []}).marshal()
+    assert len(calls) == 1
+
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_marshal_nested_collection_getters_called_after_validation(batch):
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+
+    calls = []
+
+    def getter(session):
+        calls.append(session.data['id'])
+        return TestType(id=session.data['id'])
+
+    def batch_getter(sessions):
+        return dict((i, getter(s)) for i, s in enumerate(sessions))
+
+    def has_id(session):
+        if 'id' not in session.data:
+            return session.invalid('type_error')
+        return session.data
+
+    if batch:
+        nested = field.Nested(UserMapper, batch_getter=batch_getter,
+                              extra_marshal_pipes={'validation': [has_id]})
+        opts = {}
+    else:
+        nested = field.Nested(UserMapper, getter=getter,
+                              extra_marshal_pipes={'validation': [has_id]})
+        opts = {'getter_pool': 2}
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        readers = field.Collection(nested, **opts)
+
+    try:
+        with pytest.raises(MappingInvalid) as e:
+            PostMapper(data={'readers': [{'id': '1'}, {}]}).marshal()
+        assert e.value.errors == {'readers': 'Invalid type'}
+        assert calls == []
+
+        result = PostMapper(data={'readers': [{'id': '1'}, {'id': '2'}]}).marshal()
+        assert [r.id for r in result.readers] == ['1', '2']
+        assert sorted(calls) == ['1', '2']
+    finally:
+        PostMapper.close_pools()
+
 def test_marshal_collection_sets_parent_session_scope():
 
     class UserMapper(Mapper):
@@ -208,6 +208,29 @@ def test_marshal_nested_with_getter():
     assert output == {'user': {'id': '2', 'name': 'jack'}}
 
 
+def test_marshal_nested_with_batch_getter():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = field.String(required=True)
+        name = field.String()
+
+    users = {'1': {'id': '1', 'name': 'mike'}}
+
+    def batch_getter(sessions):
+        return dict((i, users.get(s.data['id'])) for i, s in enumerate(sessions))
+
+    test_field = field.Nested('UserMapper', name='user', batch_getter=batch_getter)
+
+    data = {'id': 2, 'name': 'bob', 'user': {'id': '1'}}
+    output = {}
+    mapper_session = get_mapper_session(data=data, output=output)
+    test_field.marshal(mapper_session)
+    assert output == {'user': {'id': '1', 'name': 'mike'}}
+
+
 def test_marshal_nested_with_getter_failure():
 
     class UserMapper(Mapper):
@@ -0,0 +1,88 @@
+import time
+
+from kim import Mapper, field, profiling
+from kim.pipelines.base import get_data_from_source
+
+from .helpers import TestType
+
+
+def slow_pipe(session):
+    time.sleep(0.002)
+    return session.data
+
+
+def get_mappers():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.Integer()
+        name = field.String(extra_serialize_pipes={'process': [slow_pipe]})
+
+    class OtherMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.Integer()
+
+    return UserMapper, OtherMapper
+
+
+def test_profiler_records_pipes():
+
+    UserMapper, OtherMapper = get_mappers()
+    users = [TestType(id=i, name='bob') for i in range(3)]
+
+    with profiling.PipeProfiler() as profiler:
+        assert profiling.active is profiler
+        UserMapper.many().serialize(users)
+        OtherMapper(obj=users[0]).serialize()
+
+    assert profiling.active is None
+
+    stats = profiler.stats()
+    slowest = stats[0]
+    assert (slowest.mapper, slowest.field, slowest.pipe) == (
+        'UserMapper', 'name', 'slow_pipe')
+    assert slowest.calls == 3
+    assert slowest.total >= 0.006
+    assert slowest.p50 <= slowest.p99 <= slowest.max
+
+    keys = set((s.mapper, s.field, s.pipe) for s in stats)
+    assert ('UserMapper', 'id', get_data_from_source.__name__) in keys
+    assert ('OtherMapper', 'id', get_data_from_source.__name__) in keys
+
+    report = profiler.report(limit=1)
+    assert 'slow_pipe' in report
+    assert len(report.splitlines()) == 3
+
+
+def test_profiler_mappers_filter():
+
+    UserMapper, OtherMapper = get_mappers()
+    user = TestType(id=1, name='bob')
+
+    profiler = profiling.enable(profiling.PipeProfiler(mappers=[OtherMapper]))
+    try:
+        assert UserMapper(obj=user).serialize() == {'id': 1, 'name': 'bob'}
+        OtherMapper(obj=user).serialize()
+    finally:
+        assert profiling.disable() is profiler
+
+    assert set(s.mapper for s in profiler.stats()) == set(['OtherMapper'])
+
+    profiler.reset()
+    assert profiler.stats() == []
+
+
+def test_histogram_percentile():
+
+    histogram = profiling.Histogram()
+    for elapsed in [0.000001] * 98 + [0.001, 0.01]:
+        histogram.add(elapsed)
+
+    assert histogram.calls == 100
+    assert histogram.percentile(50) <= 0.000002
+    assert 0.001 <= histogram.percentile(99) <= 0.002
+    assert histogram.percentile(100) == 0.01
@@ -0,0 +1,171 @@
+import json
+from datetime import datetime
+
+import pytest
+from six import StringIO, BytesIO
+
+from kim.mapper import Mapper
+from kim.field import String, Integer, DateTime, Nested, Collection
+from kim.exception import MapperError
+from kim.stream import iter_json_array
+from kim.role import whitelist
+
+from .helpers import TestType
+
+
+def add_prefix(session):
+    session.data = 'prefix-%s' % session.data
+    return session.data
+
+
+def get_mapper():
+
+    class AddressMapper(Mapper):
+
+        __type__ = TestType
+
+        street = String()
+        postcode = String(source='code.value')
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String(extra_serialize_pipes={'process': [add_prefix]})
+        created_at = DateTime()
+        address = Nested(AddressMapper, null_default={})
+        addresses = Collection(Nested(AddressMapper), default=[])
+        tags = Collection(String())
+        me = Nested(AddressMapper, source='__self__')
+
+        __roles__ = {
+            'public': whitelist('id', 'address'),
+        }
+
+    return UserMapper
+
+
+def make_user(**kwargs):
+
+    attrs = dict(
+        id=1,
+        name='mike',
+        created_at=datetime(2016, 1, 1),
+        street='old st',
+        code={'value': 'E1'},
+        address=TestType(street='high st', code=None),
+        addresses=[TestType(street='low st', code={'value': 'N1'})],
+        tags=['a', 'b'],
+    )
+    attrs.update(kwargs)
+    return TestType(**attrs)
+
+
+def serialize_to(mapper, *args, **kwargs):
+
+    stream = StringIO()
+    mapper.serialize_to(*args + (stream, ), **kwargs)
+    return stream.getvalue()
+
+
+@pytest.mark.parametrize('user', [
+    make_user(),
+    make_user(address=None, addresses=None, tags=None),
+])
+def test_serialize_to(user):
+
+    UserMapper = get_mapper()
+    result = serialize_to(UserMapper(obj=user))
+
+    assert json.loads(result) == UserMapper(obj=user).serialize()
+
+
+def test_serialize_to_role():
+
+    UserMapper = get_mapper()
+    user = make_user()
+    result = serialize_to(UserMapper(obj=user), role='public')
+
+    assert json.loads(result) == {
+        'id': 1, 'address': {'street': 'high st', 'postcode': None}}
+
+
+def test_serialize_to_none_obj():
+
+    UserMapper = get_mapper()
+    with pytest.raises(MapperError):
+        serialize_to(UserMapper(data={}))
+
+
+def test_serialize_to_many():
+
+    UserMapper = get_mapper()
+    users = [make_user(), make_user(id=2, address=None)]
+
+    result = serialize_to(UserMapper.many(), users, role='public')
+
+    assert json.loads(result) == UserMapper.many().serialize(users, role='public')
+    assert serialize_to(UserMapper.many(), []) == '[]'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 65536])
+def test_iter_json_array(chunk_size):
+
+    data = u' [{"a": "\u00e9", "b": [1, 2.5, true, null]}, 12345 , "x\\"y", []] '
+
+    expected = [{'a': u'\u00e9', 'b': [1, 2.5, True, None]}, 12345, 'x"y', []]
+    assert list(iter_json_array(
+        BytesIO(data.encode('utf-8')), chunk_size=chunk_size)) == expected
+    assert list(iter_json_array(
+        StringIO(data), chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize('doc', [
+    u'[12.25]', u'[1.5e10, 2]', u'[-0.5E-3,1e+2 ,-7]', u'[123456789, "a"]',
+    u' [{"a": [3.75]}, 42] ',
+])
+def test_iter_json_array_numbers_split_across_chunks(doc):
+
+    expected = json.loads(doc)
+    for chunk_size in range(1, len(doc) + 1):
+        assert list(iter_json_array(
+            StringIO(doc), chunk_size=chunk_size)) == expected, chunk_size
+        assert list(iter_json_array(
+            BytesIO(doc.encode('utf-8')), chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize('data', [b'', b'{}', b'[1,', b'[1 2]', b'[1] x', b'[tru]'])
+def test_iter_json_array_invalid(data):
+
+    with pytest.raises(MapperError):
+        list(iter_json_array(BytesIO(data), chunk_size=2))
+
+
+def test_marshal_stream():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+    stream = BytesIO(b'[{"id": 1, "name": "mike"}, {"name": "bob"}]')
+    result = list(UserMapper.many().marshal_stream(stream, chunk_size=4))
+
+    (obj, errors), (invalid, invalid_errors) = result
+    assert (obj.id, obj.name, errors) == (1, 'mike', None)
+    assert invalid is None
+    assert invalid_errors == {'id': 'This is a required field'}
+
+
+def test_serialize_to_many_workers():
+
+    UserMapper = get_mapper()
+    users = [make_user(id=i) for i in range(5)]
+
+    with UserMapper.many(workers=2, executor='thread', chunk_size=2) as mappers:
+        result = serialize_to(mappers, users)
+
+    assert json.loads(result) == UserMapper.many().serialize(users)
@@ -1,4 +1,6 @@
-from kim.utils import attr_or_key
+from kim.utils import (
+    attr_or_key, get_attr_or_key_getter, get_attr_or_key_setter, _split_escape,
+    LRUCache)
 
 
 def test_attr_or_key_util():
@@ -40,3 +42,48 @@ def test_attr_or_key_util_dot_syntax_escape():
 
     assert attr_or_key(foo_dict, "bar\\.xyz") == "abc"
 
+
+def test_get_attr_or_key_getter():
+
+    class Foo(object):
+
+        bar = {'xyz': 'abc', 'a.b': 'c'}
+
+    assert get_attr_or_key_getter(['bar'])(Foo()) == Foo.bar
+    assert get_attr_or_key_getter(['qux'])(Foo()) is None
+    assert get_attr_or_key_getter(['bar', 'xyz'])(Foo()) == 'abc'
+    assert get_attr_or_key_getter(['bar', 'qux'])(Foo()) is None
+    assert get_attr_or_key_getter(_split_escape('bar.a\\.b'))(Foo()) == 'c'
+
+
+def test_get_attr_or_key_setter():
+
+    class Foo(object):
+
+        bar = None
+
+    foo = Foo()
+    foo.bar = {}
+    get_attr_or_key_setter(['bar', 'xyz'])(foo, 'abc')
+    get_attr_or_key_setter(['qux'])(foo, 'baz')
+
+    assert foo.bar == {'xyz': 'abc'}
+    assert foo.qux == 'baz'
+
+    data = {}
+    get_attr_or_key_setter(_split_escape('a\\.b'))(data, 'c')
+    assert data == {'a.b': 'c'}
+
+
+def test_lru_cache():
+
+    cache = LRUCache(2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache.get('a') == 1
+
+    cache['c'] = 3
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)